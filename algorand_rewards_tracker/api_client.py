@@ -0,0 +1,190 @@
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from cassette import install_cassette
+from rate_limit import get_host_limiter, parse_retry_after
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, fall back to JSON
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib decoder
+    orjson = None
+
+ALGOD_URL = "https://mainnet-api.algonode.cloud"
+INDEXER_URL = "https://mainnet-idx.algonode.cloud"
+PROPOSER_PAYOUT_NOTE_PREFIX = 'UHJvcG9zZXJQYXlvdXQ='  # Base64 encoded "ProposerPayout"
+
+# Only the fields the trackers actually read are kept from API responses
+ACCOUNT_FIELDS = (
+    'address', 'amount', 'rewards', 'rewards-base', 'pending-rewards',
+    'status', 'participation', 'min-balance',
+)
+# algod's msgpack account encoding (basics.AccountData) omits these derived
+# fields, so requesting any of them forces a JSON response
+JSON_ONLY_ACCOUNT_FIELDS = ('address', 'pending-rewards', 'min-balance')
+# Asset holdings and app state can dwarf the rest of an account; unless one of
+# these is asked for, algod is told to leave them out with exclude=all
+EXCLUDABLE_ACCOUNT_FIELDS = ('assets', 'apps-local-state', 'created-assets', 'created-apps')
+STATUS_FIELDS = ('last-round', 'time-since-last-round')
+SUPPLY_FIELDS = ('current_round', 'online-money', 'total-money')
+TRANSACTION_FIELDS = ('id', 'confirmed-round', 'round-time', 'payment-transaction')
+
+# algod encodes msgpack account responses with its short codec keys
+MSGPACK_ACCOUNT_KEYS = {
+    'algo': 'amount',
+    'ern': 'rewards',
+    'ebase': 'rewards-base',
+    'onl': 'status',
+}
+MSGPACK_PARTICIPATION_KEYS = {
+    'voteFst': 'vote-first-valid',
+    'voteLst': 'vote-last-valid',
+    'voteKD': 'vote-key-dilution',
+    'sel': 'selection-participation-key',
+    'vote': 'vote-participation-key',
+}
+MSGPACK_STATUS_NAMES = {0: 'Offline', 1: 'Online', 2: 'NotParticipating'}
+
+THROTTLED_STATUS_CODES = (429, 503)
+MAX_THROTTLED_RETRIES = 5
+
+
+def decode_json(content: bytes) -> Any:
+    """Decode a JSON payload, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def project(data: Dict, fields: Iterable[str]) -> Dict:
+    """Return a copy of data holding only the given fields."""
+    return {field: data[field] for field in fields if field in data}
+
+
+def project_account(account: Dict, fields: Iterable[str] = ACCOUNT_FIELDS) -> Dict:
+    """Reduce an account response to the fields used by the trackers."""
+    if any(key in account for key in MSGPACK_ACCOUNT_KEYS):
+        account = _normalize_msgpack_account(account)
+    return project(account, fields)
+
+
+def project_transaction(tx: Dict) -> Dict:
+    """Reduce an indexer transaction to the fields used by the trackers."""
+    projected = project(tx, TRANSACTION_FIELDS)
+    payment = projected.get('payment-transaction')
+    if payment:
+        projected['payment-transaction'] = {'amount': payment.get('amount', 0)}
+    return projected
+
+
+def _normalize_msgpack_account(account: Dict) -> Dict:
+    """Map algod's msgpack account keys onto the JSON field names."""
+    normalized = dict(account)
+    for short_key, name in MSGPACK_ACCOUNT_KEYS.items():
+        if short_key in normalized:
+            normalized[name] = normalized.pop(short_key)
+
+    if isinstance(normalized.get('status'), int):
+        normalized['status'] = MSGPACK_STATUS_NAMES.get(normalized['status'], 'Offline')
+
+    participation = {
+        name: normalized.pop(short_key)
+        for short_key, name in MSGPACK_PARTICIPATION_KEYS.items()
+        if short_key in normalized
+    }
+    if participation:
+        normalized['participation'] = participation
+    return normalized
+
+
+class AlgorandAPIClient:
+    def __init__(self, algod_url: str = ALGOD_URL, indexer_url: str = INDEXER_URL,
+                 headers: Optional[Dict[str, str]] = None, use_msgpack: bool = True,
+                 session: Optional[requests.Session] = None):
+        """Initialize a pooled client for the algod and indexer APIs."""
+        self.algod_url = algod_url
+        self.indexer_url = indexer_url
+        self.use_msgpack = use_msgpack and msgpack is not None
+        self.session = session or requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        # Record or replay algod/indexer traffic when ALGO_CASSETTE is set
+        install_cassette(self.session)
+
+        # Transfer and decode statistics, used by the decode benchmark
+        self.calls = 0
+        self.bytes_received = 0
+        self.decode_seconds = 0.0
+
+    def get_account_info(self, address: str, fields: Iterable[str] = ACCOUNT_FIELDS) -> Dict:
+        """Fetch the projected account information for an address.
+
+        msgpack is only requested when none of the fields are JSON-only, and
+        assets and apps are only transferred when one of the fields needs them.
+        """
+        fields = tuple(fields)
+        msgpack_ok = not any(field in JSON_ONLY_ACCOUNT_FIELDS for field in fields)
+        params = {}
+        if not any(field in EXCLUDABLE_ACCOUNT_FIELDS for field in fields):
+            params['exclude'] = 'all'
+        data = self._get(f"{self.algod_url}/v2/accounts/{address}", params, msgpack_ok=msgpack_ok)
+        return project_account(data, fields)
+
+    def get_status(self) -> Dict:
+        """Fetch the projected node status."""
+        data = self._get(f"{self.algod_url}/v2/status")
+        return project(data, STATUS_FIELDS)
+
+    def get_supply(self) -> Dict:
+        """Fetch the projected ledger supply, including the online stake."""
+        data = self._get(f"{self.algod_url}/v2/ledger/supply")
+        return project(data, SUPPLY_FIELDS)
+
+    def get_payout_transactions(self, address: str, after_time: str, limit: int = 1000,
+                                min_round: Optional[int] = None) -> List[Dict]:
+        """Fetch the projected ProposerPayout transactions for an address."""
+        params = {
+            'after-time': after_time,
+            'limit': limit,
+            'note-prefix': PROPOSER_PAYOUT_NOTE_PREFIX,
+        }
+        if min_round is not None:
+            params['min-round'] = min_round
+        data = self._get(f"{self.indexer_url}/v2/accounts/{address}/transactions", params)
+        return [project_transaction(tx) for tx in data.get('transactions', [])]
+
+    def _get(self, url: str, params: Optional[Dict] = None, msgpack_ok: bool = False) -> Any:
+        """Perform a GET request and decode the response body."""
+        params = dict(params or {})
+        if msgpack_ok and self.use_msgpack:
+            params['format'] = 'msgpack'
+
+        # Requests are paced per host and retried when the endpoint throttles us
+        limiter = get_host_limiter(urlparse(url).netloc)
+        for attempt in range(MAX_THROTTLED_RETRIES + 1):
+            with limiter.slot():
+                response = self.session.get(url, params=params)
+            if response.status_code not in THROTTLED_STATUS_CODES:
+                limiter.on_success()
+                break
+            limiter.on_throttled(parse_retry_after(response.headers.get('Retry-After')))
+        response.raise_for_status()
+        content = response.content
+
+        start = time.perf_counter()
+        if response.headers.get('Content-Type', '').startswith('application/msgpack'):
+            data = msgpack.unpackb(content, raw=False, strict_map_key=False)
+        else:
+            data = decode_json(content)
+        self.decode_seconds += time.perf_counter() - start
+        self.bytes_received += len(content)
+        self.calls += 1
+        return data
@@ -0,0 +1,141 @@
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_ENV = 'ALGO_CASSETTE'  # Path of the cassette file
+MODE_ENV = 'ALGO_CASSETTE_MODE'  # "record" or "replay"
+LATENCY_ENV = 'ALGO_CASSETTE_LATENCY'  # Multiplier for recorded latency on replay, 0 disables
+
+# Only headers the clients read are kept, to keep cassettes compact
+KEPT_HEADERS = ('Content-Type', 'Retry-After')
+
+
+def _key(method: str, url: str) -> str:
+    return f"{method} {url}"
+
+
+class Cassette:
+    def __init__(self, path: Path):
+        """Gzipped JSON lines of recorded algod/indexer interactions."""
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.interactions: Dict[str, List[Dict]] = defaultdict(list)
+        self.positions: Dict[str, int] = defaultdict(int)
+
+    def load(self) -> 'Cassette':
+        with gzip.open(self.path, 'rt') as f:
+            for line in f:
+                interaction = json.loads(line)
+                self.interactions[_key(interaction['method'], interaction['url'])].append(interaction)
+        return self
+
+    def append(self, interaction: Dict):
+        # Each interaction is written as its own gzip member, so concurrent
+        # recorders append whole records and the file stays readable
+        data = gzip.compress((json.dumps(interaction, separators=(',', ':')) + '\n').encode())
+        with self.lock, open(self.path, 'ab') as f:
+            f.write(data)
+
+    def next(self, method: str, url: str) -> Optional[Dict]:
+        """Return the next recorded response for a request, repeating the last once exhausted."""
+        key = _key(method, url)
+        with self.lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                return None
+            position = self.positions[key]
+            self.positions[key] = min(position + 1, len(recorded) - 1)
+            return recorded[position]
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, cassette: Cassette, **kwargs):
+        """Send requests over the network and record every response."""
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.cassette.append({
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'body': base64.b64encode(response.content).decode(),
+            'elapsed': elapsed,
+        })
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    def __init__(self, cassette: Cassette, latency_factor: float = 0.0, **kwargs):
+        """Serve recorded responses without touching the network."""
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.latency_factor = latency_factor
+
+    def send(self, request, **kwargs):
+        interaction = self.cassette.next(request.method, request.url)
+        if interaction is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request.method} {request.url}", request=request
+            )
+        if self.latency_factor:
+            time.sleep(interaction['elapsed'] * self.latency_factor)
+
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(interaction['body'])
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=interaction['elapsed'])
+        response.connection = self
+        return response
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def _get_cassette(path: str, mode: str) -> Cassette:
+    """Share one cassette per path between the clients of a process."""
+    with _cassettes_lock:
+        if path not in _cassettes:
+            cassette = Cassette(path)
+            _cassettes[path] = cassette.load() if mode == 'replay' else cassette
+        return _cassettes[path]
+
+
+def install_cassette(session: requests.Session):
+    """Mount a recording or replaying adapter on a session, as configured by environment."""
+    path = os.getenv(CASSETTE_ENV)
+    if not path:
+        return
+    mode = os.getenv(MODE_ENV, 'replay')
+    cassette = _get_cassette(path, mode)
+    if mode == 'record':
+        adapter = RecordingAdapter(cassette)
+    elif mode == 'replay':
+        adapter = ReplayAdapter(cassette, float(os.getenv(LATENCY_ENV, '0')))
+    else:
+        raise ValueError(f"Unknown {MODE_ENV}: {mode}")
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
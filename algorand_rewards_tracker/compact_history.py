@@ -0,0 +1,42 @@
+import os
+import logging
+from supabase import create_client
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+def compact_history(supabase, raw_retention_days: int, daily_retention_days: int) -> dict:
+    """Roll old rewards_history samples into the daily and weekly tiers"""
+    result = supabase.rpc('compact_rewards_history', {
+        'raw_retention': f"{raw_retention_days} days",
+        'daily_retention': f"{daily_retention_days} days"
+    }).execute()
+    return result.data[0] if result.data else {}
+
+def main():
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_KEY')
+    
+    if not supabase_url or not supabase_key:
+        raise ValueError("Missing Supabase credentials")
+    
+    supabase = create_client(supabase_url=supabase_url, supabase_key=supabase_key)
+    raw_retention_days = int(os.getenv('RAW_RETENTION_DAYS', '30'))
+    daily_retention_days = int(os.getenv('DAILY_RETENTION_DAYS', '365'))
+    
+    summary = compact_history(supabase, raw_retention_days, daily_retention_days)
+    logger.info(
+        f"Compacted {summary.get('raw_rows_compacted', 0)} hourly rows older than {raw_retention_days} days "
+        f"and {summary.get('daily_rows_compacted', 0)} daily rows older than {daily_retention_days} days"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import logging
+import os
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+EVENTS_URL_ENV = 'REWARDS_EVENTS_URL'
+DEFAULT_PORT = 8765
+BACKLOG_SIZE = 1000  # Events kept for subscribers reconnecting with Last-Event-ID
+
+
+class EventPublisher:
+    def __init__(self, url: Optional[str]):
+        """Publish events to an SSE hub; does nothing when no hub is configured."""
+        self.url = url.rstrip('/') if url else None
+        self.session = requests.Session()
+
+    def publish(self, kind: str, payload: Dict[str, Any]):
+        if not self.url:
+            return
+        try:
+            response = self.session.post(
+                f"{self.url}/publish",
+                json={'kind': kind, 'payload': payload},
+                timeout=2
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # Live updates are best effort, never fail a tracking run over them
+            logger.warning(f"Error publishing {kind} event: {e}")
+
+
+class SSESubscriber:
+    def __init__(self, url: str, backlog_size: int = BACKLOG_SIZE):
+        """Follow the hub's event stream in a background thread.
+
+        One subscriber can be shared by many readers: each keeps a cursor and
+        asks for the events received after it.
+        """
+        self.url = url.rstrip('/')
+        self._events = deque(maxlen=backlog_size)
+        self._received = 0
+        self._lock = threading.Lock()
+        self._last_event_id: Optional[str] = None
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def cursor(self) -> int:
+        """Position just after the latest received event."""
+        with self._lock:
+            return self._received
+
+    def events_since(self, cursor: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return the new cursor and the events received after cursor (at most the backlog)."""
+        with self._lock:
+            count = min(self._received - cursor, len(self._events))
+            events = list(self._events)[len(self._events) - count:] if count > 0 else []
+            return self._received, events
+
+    def _listen(self):
+        while True:
+            headers = {'Accept': 'text/event-stream'}
+            if self._last_event_id:
+                headers['Last-Event-ID'] = self._last_event_id
+            try:
+                with requests.get(f"{self.url}/events", headers=headers, stream=True, timeout=(5, None)) as response:
+                    response.raise_for_status()
+                    self._read_stream(response)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Event stream disconnected: {e}")
+            threading.Event().wait(5)
+
+    def _read_stream(self, response: requests.Response):
+        event: Dict[str, str] = {}
+        # The hub streams without chunked encoding, so a larger chunk size would
+        # wait for the connection to close; events are small and infrequent
+        for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+            if line:
+                field, _, value = line.partition(':')
+                event[field] = value.lstrip()
+                continue
+            if 'data' in event:
+                self._last_event_id = event.get('id', self._last_event_id)
+                with self._lock:
+                    self._events.append({
+                        'kind': event.get('event', 'message'),
+                        'payload': json.loads(event['data']),
+                    })
+                    self._received += 1
+            event = {}
+
+
+def get_publisher() -> EventPublisher:
+    """Return a publisher for the hub configured in REWARDS_EVENTS_URL."""
+    return EventPublisher(os.getenv(EVENTS_URL_ENV))
+
+
+class EventHub:
+    def __init__(self):
+        """Fan published events out to every connected SSE client."""
+        self.backlog = deque(maxlen=BACKLOG_SIZE)
+        self.next_id = 1
+        self.condition = threading.Condition()
+
+    def publish(self, kind: str, payload: Dict[str, Any]):
+        with self.condition:
+            self.backlog.append((self.next_id, kind, json.dumps(payload)))
+            self.next_id += 1
+            self.condition.notify_all()
+
+    def events_after(self, last_id: int, timeout: float) -> List[tuple]:
+        """Wait for and return events newer than last_id."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.next_id - 1 > last_id, timeout=timeout)
+            return [event for event in self.backlog if event[0] > last_id]
+
+
+def make_handler(hub: EventHub):
+    class EventHubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/publish':
+                self.send_error(404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            event = json.loads(self.rfile.read(length))
+            hub.publish(event['kind'], event['payload'])
+            self.send_response(204)
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path != '/events':
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+
+            last_id = int(self.headers.get('Last-Event-ID') or hub.next_id - 1)
+            try:
+                while True:
+                    events = hub.events_after(last_id, timeout=15)
+                    if not events:
+                        self.wfile.write(b": keep-alive\n\n")
+                    for event_id, kind, data in events:
+                        self.wfile.write(f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n".encode())
+                        last_id = event_id
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return EventHubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local rewards event hub")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(EventHub()))
+    server.daemon_threads = True
+    logger.info(f"Event hub listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
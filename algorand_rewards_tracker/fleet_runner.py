@@ -0,0 +1,287 @@
+import argparse
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+from api_client import AlgorandAPIClient
+from rate_limit import DEFAULT_RATE, configure_rate_limit, limiter_snapshot, shared_backoff
+from key_forecaster import KeyWindowCache
+from pipeline import APISource, BatchWriter, Pipeline, history_row, poll_info
+from poll_scheduler import PollScheduler
+from sampler import ChangeDetectingSampler, heartbeat_record
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+RESULT_TIMEOUT_SECONDS = 5.0  # How often run_cycle checks the workers are still alive
+JOIN_TIMEOUT_SECONDS = 10.0
+
+
+class HashRing:
+    def __init__(self, num_workers: int, replicas: int = 64):
+        """Consistent-hash ring mapping addresses onto worker indexes."""
+        self.num_workers = num_workers
+        self._ring = sorted(
+            (self._hash(f"worker-{worker}-{replica}"), worker)
+            for worker in range(num_workers)
+            for replica in range(replicas)
+        )
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+    def worker_for(self, address: str) -> int:
+        """Return the worker that owns an address."""
+        index = bisect.bisect(self._keys, self._hash(address)) % len(self._ring)
+        return self._ring[index][1]
+
+
+def _next_address(worker_id: int, queues: List[Any]) -> Optional[tuple]:
+    """Take the next work item from our own queue, stealing from peers when it is empty.
+
+    With nothing left to steal, block on our own queue so idle workers don't
+    poll between cycles. Returns None when woken without an item.
+    """
+    for offset in range(len(queues)):
+        try:
+            item = queues[(worker_id + offset) % len(queues)].get_nowait()
+        except queue.Empty:
+            continue
+        if item is not None:
+            return item
+    return queues[worker_id].get()
+
+
+def _worker(worker_id: int, queues: List[Any], results: Any, stop: Any,
+            algod_url: str, indexer_url: str, rate: float, shared_blocks: Dict[str, Any]):
+    """Fetch and compute addresses until stopped, keeping pooled connections and the status cache.
+
+    Per-address state (payout totals, last written sample) lives in the
+    parent and travels with each work item, so it doesn't matter which
+    worker, owner or thief, processes an address.
+    """
+    configure_rate_limit(rate, shared_blocks)
+    source = APISource(AlgorandAPIClient(algod_url, indexer_url))
+    pipeline = Pipeline(source)
+
+    while not stop.is_set():
+        item = _next_address(worker_id, queues)
+        if item is None:
+            continue
+
+        address, payout_totals = item
+        source.set_payout_totals(address, payout_totals)
+        try:
+            record = pipeline.process(address)
+            results.put(('ok', address, history_row(record), poll_info(record), source.pop_payout_totals(address)))
+        except Exception as e:
+            results.put(('error', address, str(e), None, source.pop_payout_totals(address)))
+
+        if queues[worker_id].empty():
+            logger.debug(f"Worker {worker_id} limits: {limiter_snapshot()}")
+
+
+class FleetRunner:
+    def __init__(self, addresses: List[str], writer: BatchWriter, heartbeat_writer: BatchWriter,
+                 num_workers: Optional[int] = None,
+                 algod_url: str = "https://mainnet-api.algonode.cloud",
+                 indexer_url: str = "https://mainnet-idx.algonode.cloud",
+                 rate: float = DEFAULT_RATE, key_windows: Optional[KeyWindowCache] = None,
+                 sampler: Optional[ChangeDetectingSampler] = None):
+        """Shard rewards tracking for many addresses across a process pool.
+
+        The per-host request rate is split evenly between the workers, and a
+        Retry-After from either host pauses every worker calling it. The
+        parent sees every result, so it owns the per-address state: the
+        change-detecting sampler and the cached payout totals. When
+        key_windows is given, it is kept up to date with each polled account.
+        """
+        self.addresses = addresses
+        self.writer = writer
+        self.heartbeat_writer = heartbeat_writer
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.ring = HashRing(self.num_workers)
+        self.algod_url = algod_url
+        self.indexer_url = indexer_url
+        self.rate = rate
+        self.key_windows = key_windows
+        self.sampler = sampler or ChangeDetectingSampler(cache_file=None)
+        self.payout_totals: Dict[str, Dict[str, int]] = {}
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        """Start the worker processes and their queues."""
+        self.queues = [multiprocessing.Queue() for _ in range(self.num_workers)]
+        self.results = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        shared_blocks = shared_backoff(urlparse(url).netloc for url in (self.algod_url, self.indexer_url))
+        self._processes = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(worker_id, self.queues, self.results, self.stop_event,
+                      self.algod_url, self.indexer_url, self.rate / self.num_workers, shared_blocks),
+                name=f"tracker-{worker_id}",
+                daemon=True,
+            )
+            for worker_id in range(self.num_workers)
+        ]
+        for process in self._processes:
+            process.start()
+        logger.info(f"Started {self.num_workers} tracker workers")
+
+    def run_cycle(self, addresses: Optional[List[str]] = None,
+                  scheduler: Optional[PollScheduler] = None) -> Dict[str, int]:
+        """Track the given addresses (default: all) once and funnel the results to the writer."""
+        addresses = self.addresses if addresses is None else addresses
+        owners = set()
+        for address in addresses:
+            owner = self.ring.worker_for(address)
+            owners.add(owner)
+            self.queues[owner].put((address, self.payout_totals.get(address)))
+        # Wake the workers that own nothing this cycle so they can steal
+        for worker_id in range(self.num_workers):
+            if worker_id not in owners:
+                self.queues[worker_id].put(None)
+
+        errors = 0
+        heartbeats = 0
+        results = [self._next_result() for _ in range(len(addresses))]
+        for kind, address, payload, info, payout_totals in results:
+            if payout_totals is not None:
+                self.payout_totals[address] = payout_totals
+            if kind == 'ok':
+                info['changed'] = self.sampler.should_write(payload)
+            if scheduler is not None:
+                scheduler.update(address, info)
+            if self.key_windows is not None and info is not None:
+                self.key_windows.update(
+                    address, info['vote_last_valid'], info['current_round'],
+                    datetime.now(timezone.utc).isoformat()
+                )
+            if kind == 'ok' and info['changed']:
+                self.writer.add(payload)
+                self.sampler.mark_written(payload)
+            elif kind == 'ok':
+                heartbeats += 1
+                self.heartbeat_writer.add(heartbeat_record(payload))
+            else:
+                errors += 1
+                logger.error(f"Error tracking {address}: {payload}")
+        self.writer.flush()
+        self.heartbeat_writer.flush()
+        if self.key_windows is not None:
+            self.key_windows.save()
+
+        return {'tracked': len(addresses) - errors, 'heartbeats': heartbeats, 'errors': errors}
+
+    def _next_result(self) -> tuple:
+        """Wait for the next worker result, failing instead of hanging if a worker died."""
+        while True:
+            try:
+                return self.results.get(timeout=RESULT_TIMEOUT_SECONDS)
+            except queue.Empty:
+                dead = [process.name for process in self._processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Tracker workers exited unexpectedly: {', '.join(dead)}")
+
+    def shutdown(self):
+        """Stop the workers, terminating any that don't exit in time."""
+        self.stop_event.set()
+        for q in self.queues:
+            q.put(None)
+        for process in self._processes:
+            process.join(JOIN_TIMEOUT_SECONDS)
+            if process.is_alive():
+                process.terminate()
+        for q in self.queues + [self.results]:
+            q.cancel_join_thread()
+            q.close()
+
+
+class DiscardWriter:
+    def __init__(self):
+        """Writer that only counts rows, for dry runs such as cassette replays."""
+        self.rows = 0
+
+    def add(self, row: Dict[str, Any]):
+        self.rows += 1
+
+    def flush(self):
+        pass
+
+
+def load_addresses(path: Optional[str]) -> List[str]:
+    """Load addresses from a file (one per line) or the ALGO_ADDRESSES variable."""
+    if path:
+        with open(path, 'r') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return [a.strip() for a in os.getenv('ALGO_ADDRESSES', '').split(',') if a.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track rewards for a fleet of addresses")
+    parser.add_argument('--addresses-file', help="file with one address per line")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--interval', type=int, default=3600, help="base seconds between polls of an address")
+    parser.add_argument('--once', action='store_true', help="run a single cycle and exit")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="fetch and compute without writing to Supabase or the local caches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    addresses = load_addresses(args.addresses_file)
+    if not addresses:
+        raise ValueError("No addresses to track")
+
+    if args.dry_run:
+        writer, heartbeat_writer = DiscardWriter(), DiscardWriter()
+        key_windows = KeyWindowCache(cache_file=None)
+    else:
+        from supabase import create_client
+
+        supabase_url = os.getenv('SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_KEY')
+        if not supabase_url or not supabase_key:
+            raise ValueError("Missing Supabase credentials")
+        supabase = create_client(supabase_url=supabase_url, supabase_key=supabase_key)
+        writer = BatchWriter(supabase, batch_size=args.batch_size)
+        heartbeat_writer = BatchWriter(supabase, "rewards_heartbeat", batch_size=args.batch_size, upsert=True)
+        key_windows = KeyWindowCache()
+
+    runner = FleetRunner(addresses, writer, heartbeat_writer, args.workers, key_windows=key_windows)
+    # Polls are spread over the interval instead of all firing at once
+    scheduler = PollScheduler(addresses, base_interval=args.interval)
+    runner.start()
+    try:
+        while True:
+            due = addresses if args.once else scheduler.due()
+            if due:
+                started = time.monotonic()
+                summary = runner.run_cycle(due, scheduler)
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"Tracked {summary['tracked']} addresses ({summary['heartbeats']} unchanged, "
+                    f"{summary['errors']} errors) in {elapsed:.1f}s"
+                )
+            if args.once:
+                break
+            time.sleep(scheduler.seconds_until_next())
+    finally:
+        runner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
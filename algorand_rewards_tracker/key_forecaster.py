@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from pipeline import SECONDS_PER_ROUND
+
+HALF_LIFE_ROUNDS = 200_000  # About a week of rounds
+MIN_INTERVAL_ROUNDS = 100  # Shorter intervals are dominated by status caching and clock jitter
+BACKFILL_DAYS = 30  # History read on the first refresh
+STATELESS_BACKFILL_DAYS = 7  # History read by single-address runs that keep no state between runs
+PAGE_SIZE = 1000  # PostgREST returns at most this many rows per request
+EXPIRY_WARNING_DAYS = 14
+
+
+class RoundTimeEstimator:
+    def __init__(self, state_file: Optional[Path] = Path('round_time.json'),
+                 half_life_rounds: float = HALF_LIFE_ROUNDS):
+        """Measured seconds per round from the (timestamp, current_round) samples in rewards_history.
+
+        Consecutive samples of an address give (seconds, rounds) intervals.
+        Their totals decay with a half-life in rounds of chain progress, so
+        the estimate follows changes in block time however many addresses
+        are sampled. Each refresh only reads rows added since the last one;
+        the totals and the last sample per address are kept in state_file
+        (in memory only when it is None).
+        """
+        self.state_file = state_file
+        self.half_life_rounds = half_life_rounds
+        self.state: Dict[str, Any] = {
+            'seconds': 0.0, 'rounds': 0.0, 'last_id': 0, 'last_round': 0, 'last_samples': {},
+        }
+        if state_file and state_file.exists():
+            with open(state_file, 'r') as f:
+                self.state.update(json.load(f))
+
+    @property
+    def seconds_per_round(self) -> float:
+        """The current estimate, or the nominal round time until enough samples were seen."""
+        if self.state['rounds'] <= 0:
+            return SECONDS_PER_ROUND
+        return self.state['seconds'] / self.state['rounds']
+
+    def update(self, samples: pd.DataFrame):
+        """Fold new (address, timestamp, current_round) samples into the estimate."""
+        if samples.empty:
+            return
+        new = samples[['address', 'timestamp', 'current_round']]
+        # Continue each address's series from the last sample already counted
+        previous = pd.DataFrame(
+            [
+                {'address': address, **sample}
+                for address, sample in self.state['last_samples'].items()
+                if address in set(new['address'])
+            ],
+            columns=['address', 'timestamp', 'current_round'],
+        )
+        s = pd.concat([previous, new], ignore_index=True)
+        s['timestamp'] = pd.to_datetime(s['timestamp'], utc=True, format='ISO8601')
+        s = s.sort_values(['address', 'timestamp'], kind='stable')
+
+        grouped = s.groupby('address', sort=False)
+        seconds = grouped['timestamp'].diff().dt.total_seconds().to_numpy()
+        rounds = grouped['current_round'].diff().to_numpy(dtype=float)
+        valid = (rounds >= MIN_INTERVAL_ROUNDS) & (seconds > 0)
+
+        # Decay by how far the chain advanced since the last batch
+        latest_round = int(s['current_round'].max())
+        advanced = max(latest_round - self.state['last_round'], 0) if self.state['last_round'] else 0
+        decay = 0.5 ** (advanced / self.half_life_rounds)
+        self.state['seconds'] = self.state['seconds'] * decay + seconds[valid].sum()
+        self.state['rounds'] = self.state['rounds'] * decay + rounds[valid].sum()
+        self.state['last_round'] = max(self.state['last_round'], latest_round)
+
+        for row in grouped.tail(1).itertuples(index=False):
+            self.state['last_samples'][row.address] = {
+                'timestamp': row.timestamp.isoformat(),
+                'current_round': int(row.current_round),
+            }
+
+    def refresh(self, supabase, address: Optional[str] = None,
+                backfill_days: float = BACKFILL_DAYS) -> int:
+        """Read the rewards_history rows added since the last refresh; returns how many were read.
+
+        A first refresh reads backfill_days of history. Runs that keep no
+        state between invocations should pass their address and a short
+        backfill (see STATELESS_BACKFILL_DAYS) to keep that read small.
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=backfill_days)).isoformat()
+        read = 0
+        while True:
+            query = supabase.table('rewards_history')\
+                .select('id,address,timestamp,current_round')\
+                .gt('id', self.state['last_id'])
+            if address:
+                query = query.eq('address', address)
+            if not self.state['last_id']:
+                query = query.gte('timestamp', since)
+            page = query.order('id').limit(PAGE_SIZE).execute().data
+            if page:
+                self.update(pd.DataFrame(page))
+                self.state['last_id'] = page[-1]['id']
+                read += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+        self.save()
+        return read
+
+    def save(self):
+        """Persist the estimator state."""
+        if not self.state_file:
+            return
+        with open(self.state_file, 'w') as f:
+            json.dump(self.state, f)
+
+
+class KeyWindowCache:
+    def __init__(self, cache_file: Optional[Path] = Path('key_windows.json')):
+        """Last seen participation key window of each account, with the round it was seen at."""
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.windows: Dict[str, Dict[str, Any]] = {}
+        if cache_file and cache_file.exists():
+            with open(cache_file, 'r') as f:
+                self.windows = json.load(f)
+
+    def update(self, address: str, vote_last_valid: Optional[int], current_round: int,
+               timestamp: str, vote_first_valid: Optional[int] = None):
+        with self.lock:
+            self.windows[address] = {
+                'vote_first_valid': vote_first_valid,
+                'vote_last_valid': vote_last_valid,
+                'current_round': current_round,
+                'timestamp': timestamp,
+            }
+
+    def frame(self) -> pd.DataFrame:
+        """The cached windows as one row per address."""
+        with self.lock:
+            rows = [{'address': address, **window} for address, window in self.windows.items()]
+        return pd.DataFrame(
+            rows, columns=['address', 'vote_first_valid', 'vote_last_valid', 'current_round', 'timestamp']
+        )
+
+    def save(self):
+        """Persist the cached windows."""
+        if not self.cache_file:
+            return
+        with self.lock:
+            data = json.dumps(self.windows)
+        with open(self.cache_file, 'w') as f:
+            f.write(data)
+
+
+class KeyWindowSink:
+    def __init__(self, cache: KeyWindowCache):
+        """Pipeline sink keeping a KeyWindowCache up to date with every fetched account."""
+        self.cache = cache
+
+    def write(self, record: Dict[str, Any]):
+        self.cache.update(
+            record['address'], record['vote_last_valid'], record['current_round'],
+            record['timestamp'].isoformat(), record['vote_first_valid'],
+        )
+
+    def flush(self):
+        self.cache.save()
+
+
+def forecast_expiry(windows: pd.DataFrame, seconds_per_round: float = SECONDS_PER_ROUND,
+                    now: Optional[datetime] = None,
+                    warning_days: float = EXPIRY_WARNING_DAYS) -> pd.DataFrame:
+    """Estimate when every account's participation keys expire, without network calls.
+
+    The chain is shared, so the current round is extrapolated from the
+    freshest observation in the cache at the measured round time. Accounts
+    whose keys expire within warning_days are flagged as expiring.
+    """
+    result = windows.copy()
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    if result.empty:
+        return result.assign(current_round_estimate=[], rounds_remaining=[], days_remaining=[],
+                             expires_at=[], expiring=[], no_keys=[])
+
+    observed_at = pd.to_datetime(result['timestamp'], utc=True, format='ISO8601')
+    elapsed = (now - observed_at).dt.total_seconds().to_numpy()
+    current_round = np.max(result['current_round'].to_numpy(dtype=float) + elapsed / seconds_per_round)
+
+    vote_last_valid = pd.to_numeric(result['vote_last_valid']).to_numpy(dtype=float)
+    rounds_remaining = np.maximum(vote_last_valid - current_round, 0.0)
+    seconds_remaining = rounds_remaining * seconds_per_round
+
+    result['current_round_estimate'] = int(current_round)
+    result['rounds_remaining'] = np.round(rounds_remaining)
+    result['days_remaining'] = seconds_remaining / 86400
+    result['expires_at'] = now + pd.to_timedelta(seconds_remaining, unit='s')
+    result['no_keys'] = np.isnan(vote_last_valid) | (vote_last_valid <= 0)
+    result['expiring'] = ~result['no_keys'] & (result['days_remaining'] < warning_days)
+    return result.sort_values('expires_at', na_position='first').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast participation key expiry for every tracked account")
+    parser.add_argument('--refresh', action='store_true',
+                        help="update the round time estimate from rewards_history first")
+    parser.add_argument('--warning-days', type=float, default=EXPIRY_WARNING_DAYS)
+    parser.add_argument('--expiring-only', action='store_true', help="only list accounts needing renewal")
+    args = parser.parse_args()
+
+    estimator = RoundTimeEstimator()
+    if args.refresh:
+        from supabase import create_client
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        supabase_url = os.getenv('SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_KEY')
+        if not supabase_url or not supabase_key:
+            raise ValueError("Missing Supabase credentials")
+        read = estimator.refresh(create_client(supabase_url=supabase_url, supabase_key=supabase_key))
+        print(f"Read {read} new rewards_history samples")
+
+    forecast = forecast_expiry(KeyWindowCache().frame(), estimator.seconds_per_round,
+                               warning_days=args.warning_days)
+    if args.expiring_only:
+        forecast = forecast[forecast['expiring'] | forecast['no_keys']]
+
+    print(f"Round time: {estimator.seconds_per_round:.3f}s")
+    print(forecast[['address', 'vote_last_valid', 'rounds_remaining', 'days_remaining',
+                    'expires_at', 'expiring', 'no_keys']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
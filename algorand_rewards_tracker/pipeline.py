@@ -0,0 +1,386 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from api_client import AlgorandAPIClient
+from sampler import ChangeDetectingSampler, heartbeat_record
+
+logger = logging.getLogger(__name__)
+
+MICROALGOS_PER_ALGO = 1_000_000
+DEFAULT_START_DATE = datetime(2025, 2, 15)
+STATUS_TTL_SECONDS = 5.0  # Rounds advance every few seconds, share one status per window
+SECONDS_PER_ROUND = 4.5
+
+
+def to_algo(microalgos: Optional[int]) -> Optional[float]:
+    """Convert microAlgos to ALGO for display and ALGO-denominated tables."""
+    return None if microalgos is None else microalgos / MICROALGOS_PER_ALGO
+
+
+class APISource:
+    def __init__(self, client: Optional[AlgorandAPIClient] = None,
+                 start_date: datetime = DEFAULT_START_DATE, payouts: bool = True,
+                 status_ttl: Optional[float] = STATUS_TTL_SECONDS):
+        """Fetch account state, node status and proposer payouts through one pooled client.
+
+        The node status is shared by every address for status_ttl seconds (for
+        the source's lifetime when None). Payout totals are cached per address,
+        so later fetches only ask the indexer for rounds after the last payout.
+        """
+        self.client = client or AlgorandAPIClient()
+        self.start_date = start_date
+        self.fetch_payouts = payouts
+        self.status_ttl = status_ttl
+        self._status: Optional[Dict] = None
+        self._status_fetched_at = 0.0
+        self._status_lock = threading.Lock()
+        self._payouts: Dict[str, Dict[str, int]] = {}
+
+    def status(self) -> Dict:
+        with self._status_lock:
+            expired = self.status_ttl is not None and time.monotonic() - self._status_fetched_at > self.status_ttl
+            if self._status is None or expired:
+                self._status = self.client.get_status()
+                self._status_fetched_at = time.monotonic()
+            return self._status
+
+    def payouts(self, address: str) -> Dict[str, Any]:
+        """Return the payouts first seen by this fetch and the running totals."""
+        totals = self._payouts.get(address)
+        min_round = totals['latest_round'] + 1 if totals and totals['latest_round'] else None
+        transactions = self.client.get_payout_transactions(
+            address, self.start_date.strftime("%Y-%m-%d"), min_round=min_round
+        )
+        new = [tx for tx in transactions if tx.get('payment-transaction')]
+
+        updated = dict(totals or {'total': 0, 'count': 0, 'latest_round': 0})
+        updated['total'] += sum(tx['payment-transaction'].get('amount', 0) for tx in new)
+        updated['count'] += len(new)
+        updated['latest_round'] = max([updated['latest_round']] + [tx.get('confirmed-round', 0) for tx in new])
+        self._payouts[address] = updated
+        return {'new': new, 'totals': updated, 'received': totals is not None and bool(new)}
+
+    def set_payout_totals(self, address: str, totals: Optional[Dict[str, int]]):
+        """Seed the payout totals of an address, e.g. from a process that tracked it before."""
+        if totals is None:
+            self._payouts.pop(address, None)
+        else:
+            self._payouts[address] = dict(totals)
+
+    def pop_payout_totals(self, address: str) -> Optional[Dict[str, int]]:
+        """Hand the payout totals of an address back to the caller and forget them."""
+        return self._payouts.pop(address, None)
+
+    def fetch(self, address: str) -> Dict[str, Any]:
+        status = self.status()
+        account = self.client.get_account_info(address)
+        payouts = self.payouts(address) if self.fetch_payouts else None
+        return {
+            'address': address,
+            'fetched_at': datetime.now(timezone.utc),
+            'account': account,
+            'status': status,
+            'payouts': payouts,
+        }
+
+
+def normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a source result into a snapshot with every amount in integer microAlgos."""
+    account = raw['account']
+    participation = account.get('participation') or {}
+    payouts = raw.get('payouts')
+    totals = payouts['totals'] if payouts else None
+    return {
+        'address': raw['address'],
+        'timestamp': raw['fetched_at'],
+        'current_round': int(raw['status'].get('last-round', 0)),
+        'status': account.get('status', 'Offline'),
+        'amount': int(account.get('amount', 0)),
+        'rewards': int(account.get('rewards', 0)),
+        'rewards_base': int(account.get('rewards-base', 0)),
+        'pending_rewards': int(account.get('pending-rewards', 0)),
+        'min_balance': int(account.get('min-balance', 0)),
+        'participation_key_present': bool(participation),
+        'vote_first_valid': participation.get('vote-first-valid'),
+        'vote_last_valid': participation.get('vote-last-valid'),
+        'vote_key_dilution': participation.get('vote-key-dilution'),
+        'new_payouts': [
+            {
+                'tx_id': tx.get('id'),
+                'round': int(tx.get('confirmed-round', 0)),
+                'round_time': int(tx.get('round-time', 0)),
+                'amount': int(tx['payment-transaction'].get('amount', 0)),
+            }
+            for tx in (payouts['new'] if payouts else [])
+        ],
+        'total_payouts': totals['total'] if totals else None,
+        'payout_count': totals['count'] if totals else None,
+        'latest_payout_round': totals['latest_round'] if totals else None,
+        'received_payout': bool(payouts and payouts['received']),
+    }
+
+
+def compute(snapshot: Dict[str, Any], start_date: datetime = DEFAULT_START_DATE,
+            seconds_per_round: float = SECONDS_PER_ROUND) -> Dict[str, Any]:
+    """Derive participation and rewards metrics from a snapshot."""
+    record = dict(snapshot)
+    current_round = record['current_round']
+    vote_first_valid = record['vote_first_valid']
+    vote_last_valid = record['vote_last_valid']
+    record['is_online'] = record['status'] == 'Online'
+
+    if vote_first_valid and vote_last_valid:
+        record['participation_active'] = (
+            vote_first_valid <= current_round <= vote_last_valid and
+            record['is_online'] and
+            record['participation_key_present']
+        )
+        record['blocks_remaining'] = max(0, vote_last_valid - current_round)
+        record['time_remaining'] = str(timedelta(seconds=record['blocks_remaining'] * seconds_per_round))
+    else:
+        record['participation_active'] = False
+        record['blocks_remaining'] = 0
+        record['time_remaining'] = "No participation keys found"
+
+    # Days are counted in local time, like the start date
+    days_running = (record['timestamp'].astimezone().replace(tzinfo=None) - start_date).days
+    total_payouts = record['total_payouts'] or 0
+    record['start_date'] = start_date
+    record['days_running'] = days_running
+    record['rewards_per_day'] = total_payouts / max(days_running, 1)  # Avoid division by zero
+    record['projected_monthly'] = record['rewards_per_day'] * 30 if days_running > 0 else None
+    return record
+
+
+def history_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the rewards_history row for a record, amounts in microAlgos."""
+    return {
+        'timestamp': record['timestamp'].isoformat(),
+        'address': record['address'],
+        'rewards': record['rewards'],
+        'rewards_base': record['rewards_base'],
+        'amount': record['amount'],
+        'cumulative_rewards': record['total_payouts'] or 0,
+        'is_online': record['is_online'],
+        'current_round': record['current_round'],
+        'pending_rewards': record['pending_rewards'],
+        'participation_active': record['participation_active'],
+    }
+
+
+def node_status_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the node_status row for a record, balance in ALGO."""
+    return {
+        'timestamp': record['timestamp'].isoformat(),
+        'address': record['address'],
+        'current_balance': to_algo(record['amount']),
+        'is_online': record['is_online'],
+        'current_round': record['current_round'],
+        'participation_key_present': record['participation_key_present'],
+        'time_remaining': record['time_remaining'],
+    }
+
+
+def reward_rows(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Build the rewards rows for the payouts first seen in a record, amounts in ALGO."""
+    return [
+        {
+            'address': record['address'],
+            'timestamp': datetime.fromtimestamp(payout['round_time'], timezone.utc).isoformat(),
+            'round': payout['round'],
+            'amount': to_algo(payout['amount']),
+            'tx_id': payout['tx_id'],
+        }
+        for payout in record['new_payouts']
+    ]
+
+
+def report_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the report fields for a record, amounts in ALGO."""
+    return {
+        'address': record['address'],
+        'start_date': record['start_date'].strftime('%Y-%m-%d'),
+        'days_running': record['days_running'],
+        'total_rewards': to_algo(record['total_payouts'] or 0),
+        'rewards_per_day': to_algo(record['rewards_per_day']),
+        'projected_monthly': to_algo(record['projected_monthly']),
+        'online': record['is_online'],
+        'current_round': record['current_round'],
+        'participation_key_present': record['participation_key_present'],
+        'participation_active': record['participation_active'],
+        'vote_first_valid': record['vote_first_valid'],
+        'vote_last_valid': record['vote_last_valid'],
+        'blocks_remaining': record['blocks_remaining'],
+        'time_remaining': record['time_remaining'],
+    }
+
+
+def poll_info(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The poll outcome the PollScheduler uses to reschedule an address."""
+    return {
+        'is_online': record['is_online'],
+        'current_round': record['current_round'],
+        'vote_last_valid': record['vote_last_valid'],
+        'received_payout': record['received_payout'],
+        'changed': record.get('changed', True),
+    }
+
+
+class BatchWriter:
+    def __init__(self, supabase, table: str = "rewards_history", batch_size: int = 500,
+                 upsert: bool = False, on_conflict: Optional[str] = None):
+        """Buffer rows and insert (or upsert) them into Supabase in batches."""
+        self.supabase = supabase
+        self.table = table
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.on_conflict = on_conflict
+        self.buffer: List[Dict[str, Any]] = []
+        self.rows_written = 0
+
+    def add(self, row: Dict[str, Any]):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        table = self.supabase.table(self.table)
+        if self.upsert and self.on_conflict:
+            table.upsert(self.buffer, on_conflict=self.on_conflict).execute()
+        elif self.upsert:
+            table.upsert(self.buffer).execute()
+        else:
+            table.insert(self.buffer).execute()
+        self.rows_written += len(self.buffer)
+        logger.info(f"Wrote batch of {len(self.buffer)} rows to {self.table}")
+        self.buffer = []
+
+
+class SupabaseSink:
+    def __init__(self, supabase, batch_size: int = 500, node_status: bool = False,
+                 rewards: bool = False):
+        """Store records in rewards_history, or only rewards_heartbeat when unchanged.
+
+        node_status and rewards additionally upsert the node status and the
+        newly seen payouts.
+        """
+        self.history = BatchWriter(supabase, 'rewards_history', batch_size)
+        self.heartbeats = BatchWriter(supabase, 'rewards_heartbeat', batch_size, upsert=True)
+        self.node_status = BatchWriter(supabase, 'node_status', batch_size, upsert=True) if node_status else None
+        self.rewards = BatchWriter(supabase, 'rewards', batch_size, upsert=True, on_conflict='tx_id') if rewards else None
+
+    def write(self, record: Dict[str, Any]):
+        row = history_row(record)
+        if record.get('changed', True):
+            self.history.add(row)
+        else:
+            self.heartbeats.add(heartbeat_record(row))
+        if self.node_status is not None:
+            self.node_status.add(node_status_row(record))
+        if self.rewards is not None:
+            for reward in reward_rows(record):
+                self.rewards.add(reward)
+
+    def flush(self):
+        for writer in (self.history, self.heartbeats, self.node_status, self.rewards):
+            if writer is not None:
+                writer.flush()
+
+
+class JSONFileSink:
+    def __init__(self, path: Path, min_interval: timedelta = timedelta(hours=1)):
+        """Append rewards_history rows to a local JSON file, at most one per address per min_interval."""
+        self.path = Path(path)
+        self.min_interval = min_interval
+
+    def load(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def write(self, record: Dict[str, Any]):
+        rows = self.load()
+        row = history_row(record)
+        # Entries without an address predate the rewards_history row format
+        last = next((r for r in reversed(rows) if r.get('address') == row['address']), None)
+        if last is None or record['timestamp'] - datetime.fromisoformat(last['timestamp']) > self.min_interval:
+            rows.append(row)
+            with open(self.path, 'w') as f:
+                json.dump(rows, f, indent=2)
+
+    def flush(self):
+        pass
+
+
+class EventSink:
+    def __init__(self, publisher):
+        """Push node status and newly seen payouts to live dashboards."""
+        self.publisher = publisher
+
+    def write(self, record: Dict[str, Any]):
+        self.publisher.publish('status', node_status_row(record))
+        for reward in reward_rows(record):
+            self.publisher.publish('reward', reward)
+
+    def flush(self):
+        pass
+
+
+class Pipeline:
+    def __init__(self, source, sinks: Iterable = (), start_date: datetime = DEFAULT_START_DATE,
+                 sampler: Optional[ChangeDetectingSampler] = None,
+                 seconds_per_round: float = SECONDS_PER_ROUND):
+        """Fetch, normalize, compute and sink the state of addresses.
+
+        A source has fetch(address); a sink has write(record) and flush().
+        With a sampler, records are flagged changed only when a tracked field
+        differs from the last written sample, and sinks store a heartbeat
+        instead of a full row for unchanged records. seconds_per_round
+        converts remaining key rounds to time, see key_forecaster.
+        """
+        self.source = source
+        self.sinks = list(sinks)
+        self.start_date = start_date
+        self.sampler = sampler
+        self.seconds_per_round = seconds_per_round
+
+    def record(self, address: str) -> Dict[str, Any]:
+        """Fetch, normalize and compute an address's record without sinking it."""
+        return compute(normalize(self.source.fetch(address)), self.start_date, self.seconds_per_round)
+
+    def process(self, address: str) -> Dict[str, Any]:
+        """Run one address through every stage and return its record."""
+        record = self.record(address)
+        row = history_row(record)
+        record['changed'] = self.sampler.should_write(row) if self.sampler is not None else True
+        for sink in self.sinks:
+            sink.write(record)
+        if self.sampler is not None and record['changed']:
+            self.sampler.mark_written(row)
+        return record
+
+    def run(self, addresses: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Process addresses and flush the sinks, returning each address's poll outcome."""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for address in addresses:
+            try:
+                results[address] = poll_info(self.process(address))
+            except Exception as e:
+                logger.error(f"Error tracking {address}: {e}")
+                results[address] = None
+        self.flush()
+        return results
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+        if self.sampler is not None:
+            self.sampler.save()
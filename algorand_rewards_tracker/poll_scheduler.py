@@ -0,0 +1,113 @@
+import hashlib
+import heapq
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_INTERVAL = 3600  # Seconds between polls of an ordinary account
+KEY_EXPIRY_ROUNDS = 200_000  # About a week of rounds before vote_last_valid
+HOT_POLLS = 4  # Polls an account stays hot after going offline or a payout
+IDLE_POLLS = 6  # Unchanged polls before an account is considered idle
+
+# Interval multipliers by priority
+URGENT = 0.25
+HOT = 0.5
+NORMAL = 1.0
+IDLE = 2.0
+
+
+def jitter_fraction(address: str) -> float:
+    """Deterministic position of an address within the polling interval, in [0, 1)."""
+    digest = hashlib.sha256(address.encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+class PollScheduler:
+    def __init__(self, addresses: Iterable[str], base_interval: float = BASE_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        """Spread account polls evenly over the interval and adjust cadence by priority.
+
+        Each address polls at a fixed phase of its interval, so load stays flat
+        and a given address is polled at the same offset every run.
+        """
+        self.base_interval = base_interval
+        self.clock = clock
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._queue: List[tuple] = []
+        self._scheduled: Dict[str, float] = {}
+        now = clock()
+        for address in addresses:
+            self.state[address] = {'hot': 0, 'idle': 0, 'was_online': None, 'priority': NORMAL}
+            self._schedule(address, self._next_slot(address, now, NORMAL))
+
+    def due(self) -> List[str]:
+        """Pop every address whose poll is due."""
+        now = self.clock()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            slot, address = heapq.heappop(self._queue)
+            # Entries superseded by a later update are skipped
+            if self._scheduled.get(address) == slot:
+                del self._scheduled[address]
+                due.append(address)
+        return due
+
+    def seconds_until_next(self) -> float:
+        if not self._queue:
+            return self.base_interval
+        return max(0.0, self._queue[0][0] - self.clock())
+
+    def update(self, address: str, info: Optional[Dict[str, Any]]):
+        """Reschedule an address from the outcome of its poll.
+
+        info holds is_online, current_round, vote_last_valid, received_payout
+        and changed; None means the poll failed.
+        """
+        state = self.state[address]
+        if info is not None:
+            state['priority'] = self._priority(state, info)
+        self._schedule(address, self._next_slot(address, self.clock(), state['priority']))
+
+    def _schedule(self, address: str, slot: float):
+        self._scheduled[address] = slot
+        heapq.heappush(self._queue, (slot, address))
+
+    def _priority(self, state: Dict[str, Any], info: Dict[str, Any]) -> float:
+        went_offline = state['was_online'] and not info.get('is_online')
+        state['was_online'] = info.get('is_online')
+        if went_offline or info.get('received_payout'):
+            state['hot'] = HOT_POLLS
+        state['idle'] = 0 if info.get('changed') else state['idle'] + 1
+
+        vote_last_valid = info.get('vote_last_valid') or 0
+        rounds_left = vote_last_valid - info.get('current_round', 0)
+        if vote_last_valid and rounds_left < KEY_EXPIRY_ROUNDS:
+            return URGENT
+        if went_offline:
+            return URGENT
+        if state['hot']:
+            state['hot'] -= 1
+            return HOT
+        if state['idle'] >= IDLE_POLLS:
+            return IDLE
+        return NORMAL
+
+    def _next_slot(self, address: str, now: float, priority: float) -> float:
+        """Next time after now at the address's fixed phase of its interval."""
+        interval = self.base_interval * priority
+        offset = jitter_fraction(address) * interval
+        return (int((now - offset) // interval) + 1) * interval + offset
+
+    def run(self, poll: Callable[[List[str]], Dict[str, Optional[Dict[str, Any]]]],
+            sleep: Callable[[float], None] = time.sleep):
+        """Poll due addresses forever; poll returns the info per address."""
+        while True:
+            due = self.due()
+            if due:
+                logger.info(f"Polling {len(due)} due addresses")
+                results = poll(due)
+                for address in due:
+                    self.update(address, results.get(address))
+            sleep(self.seconds_until_next())
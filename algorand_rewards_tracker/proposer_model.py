@@ -0,0 +1,184 @@
+import argparse
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from supabase import create_client
+from dotenv import load_dotenv
+from api_client import AlgorandAPIClient
+
+# Load environment variables
+load_dotenv()
+
+SUPPLY_TTL_SECONDS = 600
+PAGE_SIZE = 1000  # PostgREST returns at most this many rows per request
+ADDRESS_CHUNK_SIZE = 100  # Keeps in_() filters around 6 KB of URL
+
+# Stake bounds for proposer payout eligibility, in microAlgos
+MIN_ELIGIBLE_STAKE = 30_000 * 1_000_000
+MAX_ELIGIBLE_STAKE = 70_000_000 * 1_000_000
+
+_supply_cache: Dict[str, object] = {'value': None, 'fetched_at': 0.0}
+_supply_lock = threading.Lock()
+
+
+def get_online_stake(client: AlgorandAPIClient, ttl: float = SUPPLY_TTL_SECONDS) -> int:
+    """Return the network online stake in microAlgos, fetched at most once per ttl."""
+    with _supply_lock:
+        if _supply_cache['value'] is None or time.monotonic() - _supply_cache['fetched_at'] > ttl:
+            _supply_cache['value'] = client.get_supply()['online-money']
+            _supply_cache['fetched_at'] = time.monotonic()
+        return _supply_cache['value']
+
+
+def poisson_cdf(k: np.ndarray, lam: np.ndarray) -> np.ndarray:
+    """P(X <= k) for X ~ Poisson(lam), element-wise."""
+    k = np.asarray(k, dtype=np.int64)
+    lam = np.asarray(lam, dtype=float)
+    cdf = np.zeros_like(lam)
+    positive = lam > 0
+    log_lam = np.log(np.where(positive, lam, 1.0))
+    for i in range(int(k.max(initial=0)) + 1):
+        log_pmf = -lam + i * log_lam - math.lgamma(i + 1)
+        cdf += np.where(k >= i, np.exp(log_pmf), 0.0)
+    # With no expected proposals any outcome is unsurprising
+    return np.where(positive, np.minimum(cdf, 1.0), 1.0)
+
+
+def expected_vs_actual(history: pd.DataFrame, payouts: pd.DataFrame, online_stake: int,
+                       window: str = '1D', payout_per_proposal: Optional[float] = None,
+                       alpha: float = 0.05) -> pd.DataFrame:
+    """Compare expected and actual proposer payouts per address and window.
+
+    history holds rewards_history rows (address, timestamp, amount in
+    microAlgos, is_online, current_round); payouts holds rewards rows
+    (address, timestamp, amount in ALGO). Each sample's stake is assumed to
+    hold until the next sample, so the expected proposals of an interval are
+    the rounds it spans times the account's share of the online stake, counted
+    in the window the interval starts in. Payouts outside an address's history
+    are ignored.
+    Windows whose payout count is improbably low under a Poisson model are
+    flagged as shortfalls.
+    """
+    h = history.sort_values(['address', 'timestamp']).reset_index(drop=True)
+    h['timestamp'] = pd.to_datetime(h['timestamp'], utc=True)
+    grouped = h.groupby('address', sort=False)
+
+    # Attribute each interval to the stake and status at its start
+    rounds = grouped['current_round'].diff().to_numpy()
+    stake = grouped['amount'].shift().to_numpy(dtype=float)
+    online = grouped['is_online'].shift().fillna(False).to_numpy(dtype=bool)
+    eligible = online & (stake >= MIN_ELIGIBLE_STAKE) & (stake <= MAX_ELIGIBLE_STAKE)
+    rounds = np.where(np.isnan(rounds) | (rounds < 0), 0.0, rounds)
+    h['expected_proposals'] = np.where(eligible, rounds * np.nan_to_num(stake) / online_stake, 0.0)
+    h['window'] = grouped['timestamp'].shift().dt.floor(window)
+
+    expected = h.groupby(['address', 'window'])['expected_proposals'].sum()
+
+    # Only count payouts inside the span the history covers (compaction keeps a limited raw window)
+    coverage = grouped['timestamp'].agg(['min', 'max'])
+    p = payouts.copy()
+    p['timestamp'] = pd.to_datetime(p['timestamp'], utc=True)
+    p = p.join(coverage, on='address')
+    p = p[(p['timestamp'] >= p['min']) & (p['timestamp'] <= p['max'])]
+    p['window'] = p['timestamp'].dt.floor(window)
+    actual = p.groupby(['address', 'window'])['amount'].agg(['count', 'sum'])
+
+    result = pd.concat([expected, actual], axis=1).fillna(0.0)
+    result = result.rename(columns={'count': 'actual_proposals', 'sum': 'actual_payout'})
+    result['actual_proposals'] = result['actual_proposals'].astype(np.int64)
+
+    if payout_per_proposal is None:
+        payout_per_proposal = p['amount'].mean() if not p.empty else 0.0
+    result['expected_payout'] = result['expected_proposals'] * payout_per_proposal
+
+    result['p_value'] = poisson_cdf(result['actual_proposals'].to_numpy(), result['expected_proposals'].to_numpy())
+    result['shortfall'] = (
+        (result['actual_proposals'] < result['expected_proposals']) & (result['p_value'] < alpha)
+    )
+    return result.reset_index()
+
+
+def summarize_addresses(windows: pd.DataFrame, alpha: float = 0.05) -> pd.DataFrame:
+    """Roll the per-window comparison up to one row per address."""
+    summary = windows.groupby('address')[
+        ['expected_proposals', 'actual_proposals', 'expected_payout', 'actual_payout']
+    ].sum()
+    summary['shortfall_windows'] = windows.groupby('address')['shortfall'].sum()
+    summary['p_value'] = poisson_cdf(summary['actual_proposals'].to_numpy(), summary['expected_proposals'].to_numpy())
+    summary['under_earning'] = (
+        (summary['actual_proposals'] < summary['expected_proposals']) & (summary['p_value'] < alpha)
+    )
+    return summary.reset_index()
+
+
+def fetch_all(query) -> List[Dict]:
+    """Read every row of a Supabase query, one page at a time."""
+    rows = []
+    start = 0
+    while True:
+        page = query.range(start, start + PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def load_fleet_data(supabase, addresses: List[str], since: str):
+    """Load rewards_history samples and payouts for the addresses since a date."""
+    history = []
+    payouts = []
+    # Addresses go in the query string, so large fleets are queried in chunks
+    for start in range(0, len(addresses), ADDRESS_CHUNK_SIZE):
+        chunk = addresses[start:start + ADDRESS_CHUNK_SIZE]
+        history.extend(fetch_all(
+            supabase.table('rewards_history')
+            .select('address,timestamp,amount,is_online,current_round')
+            .in_('address', chunk)
+            .gte('timestamp', since)
+            .order('id')
+        ))
+        payouts.extend(fetch_all(
+            supabase.table('rewards')
+            .select('address,timestamp,amount')
+            .in_('address', chunk)
+            .gte('timestamp', since)
+            .order('id')
+        ))
+    history_df = pd.DataFrame(history, columns=['address', 'timestamp', 'amount', 'is_online', 'current_round'])
+    payouts_df = pd.DataFrame(payouts, columns=['address', 'timestamp', 'amount'])
+    return history_df, payouts_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag nodes earning fewer proposer rewards than expected")
+    parser.add_argument('addresses_file', help="file with one address per line")
+    parser.add_argument('--since', default='2025-02-15')
+    parser.add_argument('--window', default='1D', help="pandas frequency of the comparison windows")
+    parser.add_argument('--alpha', type=float, default=0.05, help="significance level for shortfalls")
+    args = parser.parse_args()
+
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Missing Supabase credentials")
+    supabase = create_client(supabase_url=supabase_url, supabase_key=supabase_key)
+
+    with open(args.addresses_file, 'r') as f:
+        addresses = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    online_stake = get_online_stake(AlgorandAPIClient())
+    history, payouts = load_fleet_data(supabase, addresses, args.since)
+    windows = expected_vs_actual(history, payouts, online_stake, args.window, alpha=args.alpha)
+    summary = summarize_addresses(windows, args.alpha)
+
+    print(f"Online stake: {online_stake / 1e6:,.0f} ALGO")
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = float(os.getenv('ALGONODE_RATE_LIMIT', '50'))  # Requests per second per host
+DEFAULT_BURST = 10
+MIN_RATE = 0.5  # Floor for the adaptive rate, in requests per second
+INITIAL_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 64
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Return the delay in seconds requested by a Retry-After header."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int, shared_block: Optional[Any] = None):
+        """Allow up to rate requests per second with bursts of up to capacity.
+
+        The rate is AIMD: it halves when throttled and grows back by about one
+        request per second per second of successes. shared_block, a
+        multiprocessing.Value holding a wall-clock deadline, shares
+        Retry-After pauses with other processes calling the same host.
+        """
+        self.max_rate = rate
+        self.min_rate = min(MIN_RATE, rate)
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.shared_block = shared_block
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                blocked_until = self._blocked_until(now)
+                if now >= blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """Hold all requests for the given time, as asked by Retry-After."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+            if self.shared_block is not None:
+                self.shared_block.value = max(self.shared_block.value, time.time() + seconds)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def on_throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def _blocked_until(self, now: float) -> float:
+        if self.shared_block is None:
+            return self.blocked_until
+        # The shared deadline is wall-clock time, monotonic clocks differ between processes
+        return max(self.blocked_until, now + self.shared_block.value - time.time())
+
+
+class AdaptiveConcurrency:
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, minimum: int = MIN_CONCURRENCY,
+                 maximum: int = MAX_CONCURRENCY):
+        """AIMD concurrency limit: grow by one per window of successes, halve when throttled."""
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    def on_success(self):
+        with self.condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def on_throttled(self):
+        with self.condition:
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class HostLimiter:
+    def __init__(self, host: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 shared_block: Optional[Any] = None):
+        """Rate and concurrency limits for one API host."""
+        self.host = host
+        self.bucket = TokenBucket(rate, burst, shared_block)
+        self.concurrency = AdaptiveConcurrency()
+        self.throttled = 0
+        self._last_logged_limit = int(self.concurrency.limit)
+
+    @contextmanager
+    def slot(self):
+        """Hold a concurrency slot and a rate token for one request."""
+        self.concurrency.acquire()
+        try:
+            self.bucket.acquire()
+            yield
+        finally:
+            self.concurrency.release()
+
+    def on_success(self):
+        self.bucket.on_success()
+        self.concurrency.on_success()
+        self._log_limit_change()
+
+    def on_throttled(self, retry_after: float):
+        self.throttled += 1
+        self.bucket.block_for(retry_after)
+        self.bucket.on_throttled()
+        self.concurrency.on_throttled()
+        logger.warning(
+            f"{self.host} throttled, backing off {retry_after:.1f}s "
+            f"(rate {self.bucket.rate:.1f}/s, concurrency limit {self.concurrency.limit:.1f})"
+        )
+        self._last_logged_limit = int(self.concurrency.limit)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current limits, for logs and metrics."""
+        return {
+            'rate': round(self.bucket.rate, 2),
+            'concurrency_limit': round(self.concurrency.limit, 2),
+            'in_flight': self.concurrency.in_flight,
+            'throttled': self.throttled,
+        }
+
+    def _log_limit_change(self):
+        limit = int(self.concurrency.limit)
+        if limit != self._last_logged_limit:
+            self._last_logged_limit = limit
+            logger.info(f"{self.host} concurrency limit raised to {limit}")
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+_rate = DEFAULT_RATE
+_shared_blocks: Dict[str, Any] = {}
+
+
+def configure_rate_limit(rate: float, shared_blocks: Optional[Dict[str, Any]] = None):
+    """Set the per-host request rate for limiters created in this process.
+
+    shared_blocks maps hosts to multiprocessing.Values (see shared_backoff)
+    through which processes pause together when one of them is throttled.
+    """
+    global _rate, _shared_blocks
+    _rate = rate
+    _shared_blocks = shared_blocks or {}
+
+
+def shared_backoff(hosts) -> Dict[str, Any]:
+    """Create the cross-process Retry-After deadlines for hosts, to pass to configure_rate_limit."""
+    return {host: multiprocessing.Value('d', 0.0, lock=False) for host in hosts}
+
+
+def get_host_limiter(host: str) -> HostLimiter:
+    """Return the process-wide limiter for a host."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(host, _rate, shared_block=_shared_blocks.get(host))
+        return _limiters[host]
+
+
+def limiter_snapshot() -> Dict[str, Dict[str, float]]:
+    """Current limits for every host seen in this process."""
+    with _limiters_lock:
+        return {host: limiter.snapshot() for host, limiter in _limiters.items()}
@@ -1,14 +1,14 @@
 import os
 import json
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from typing import Dict, Any
-import requests
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from algo_rewards import AlgorandRewardsTracker
-import time
-import schedule
+from api_client import AlgorandAPIClient
+from sampler import ChangeDetectingSampler
+from key_forecaster import STATELESS_BACKFILL_DAYS, KeyWindowCache, KeyWindowSink, RoundTimeEstimator
+from pipeline import APISource, Pipeline, SupabaseSink, history_row
 
 # Configure logging
 logging.basicConfig(
@@ -41,82 +41,37 @@ class RewardsTracker:
             
         self.address = os.getenv('ALGO_ADDRESS', "KK4KTUPTKX3YNA5G2HMYO4CD63F6MTKXDJLIOJ5RRT7TRQK6HC25NUGZTY")
         self.start_date = datetime(2025, 2, 15)
-        self.original_balance = 145726.37
-        self.tracker = AlgorandRewardsTracker(self.address, self.start_date)
         
         # Use AlgoNode public API URLs
         self.algod_url = "https://mainnet-api.algonode.cloud"
         self.indexer_url = "https://mainnet-idx.algonode.cloud"
         self.headers = {}
-        
-    def fetch_account_info(self) -> Dict[str, Any]:
-        """Fetch account information from local node"""
-        try:
-            response = requests.get(
-                f"{self.algod_url}/v2/accounts/{self.address}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Error fetching account info: {str(e)}")
-            return {}
-
-    def check_participation_status(self) -> Dict[str, Any]:
-        """Check participation status of the node"""
-        try:
-            # Get node status
-            status_response = requests.get(
-                f"{self.algod_url}/v2/status",
-                headers=self.headers
-            )
-            status_response.raise_for_status()
-            status_data = status_response.json()
-            
-            # Get account participation info
-            account_info = self.fetch_account_info()
-            
-            return {
-                "is_online": "participation" in account_info,
-                "current_round": status_data.get("last-round", 0),
-                "participation_active": bool(account_info.get("participation", {}).get("selection-participation-key")),
-                "pending_rewards": account_info.get("pending-rewards", 0)
-            }
-        except Exception as e:
-            logger.error(f"Error checking participation status: {str(e)}")
-            return {
-                "is_online": False,
-                "current_round": 0,
-                "participation_active": False,
-                "pending_rewards": 0
-            }
+        self.client = AlgorandAPIClient(self.algod_url, self.indexer_url, headers=self.headers)
+        self.sampler = ChangeDetectingSampler(supabase=self.supabase)
+        # Runs start from a fresh checkout, so the round time comes from this address's recent samples
+        self.round_time = RoundTimeEstimator(state_file=None)
+        self.pipeline = Pipeline(
+            APISource(self.client, self.start_date),
+            [SupabaseSink(self.supabase, batch_size=1), KeyWindowSink(KeyWindowCache())],
+            self.start_date,
+            self.sampler,
+        )
 
     def process_rewards(self) -> Dict[str, Any]:
         """Process and store rewards data"""
         try:
-            account_info = self.fetch_account_info()
-            participation_status = self.check_participation_status()
-            
-            if not account_info:
-                raise ValueError("Failed to fetch account information")
-            
-            # Prepare data for storage
-            timestamp = datetime.now(timezone.utc)
-            data = {
-                "timestamp": timestamp.isoformat(),
-                "address": self.address,
-                "rewards": account_info.get("rewards", 0),
-                "rewards_base": account_info.get("rewards-base", 0),
-                "amount": account_info.get("amount", 0),
-                "cumulative_rewards": account_info.get("rewards-total", 0),
-                **participation_status
-            }
+            self.round_time.refresh(self.supabase, self.address, STATELESS_BACKFILL_DAYS)
+            self.pipeline.seconds_per_round = self.round_time.seconds_per_round
             
-            # Store in Supabase
-            self.supabase.table("rewards_history").insert(data).execute()
-            logger.info("Successfully stored rewards data")
+            # Store a full sample only when something changed, otherwise a heartbeat
+            record = self.pipeline.process(self.address)
+            self.pipeline.flush()
+            if record['changed']:
+                logger.info("Successfully stored rewards data")
+            else:
+                logger.info(f"No changes, recorded heartbeat at round {record['current_round']}")
             
-            return data
+            return history_row(record)
             
         except Exception as e:
             logger.error(f"Error processing rewards: {str(e)}")
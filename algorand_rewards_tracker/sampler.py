@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# rewards_history fields whose change warrants a new full sample
+TRACKED_FIELDS = (
+    'rewards', 'rewards_base', 'amount', 'cumulative_rewards',
+    'is_online', 'participation_active', 'pending_rewards',
+)
+HEARTBEAT_INTERVAL = timedelta(hours=24)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    timestamp = datetime.fromisoformat(value)
+    # Naive timestamps were written in local time
+    return timestamp if timestamp.tzinfo else timestamp.astimezone()
+
+
+def heartbeat_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the compact "still the same at round N" record for a sample."""
+    return {
+        'address': row['address'],
+        'timestamp': row['timestamp'],
+        'current_round': row['current_round'],
+    }
+
+
+class ChangeDetectingSampler:
+    def __init__(self, cache_file: Optional[Path] = Path('sampler_state.json'), supabase=None,
+                 heartbeat_interval: timedelta = HEARTBEAT_INTERVAL,
+                 tracked_fields: tuple = TRACKED_FIELDS):
+        """Decide whether a rewards_history sample needs a full row.
+
+        The last written state per address is cached in cache_file (in memory
+        only when it is None). On a cache miss the latest stored row is read
+        back from Supabase, if a client is given.
+        """
+        self.cache_file = cache_file
+        self.supabase = supabase
+        self.heartbeat_interval = heartbeat_interval
+        self.tracked_fields = tracked_fields
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if cache_file and cache_file.exists():
+            with open(cache_file, 'r') as f:
+                self.state = json.load(f)
+
+    def should_write(self, row: Dict[str, Any]) -> bool:
+        """Return True if a tracked field changed or the heartbeat interval elapsed."""
+        last = self._last_written(row['address'])
+        if last is None:
+            return True
+        if any(row.get(field) != last.get(field) for field in self.tracked_fields):
+            return True
+        elapsed = _parse_timestamp(row['timestamp']) - _parse_timestamp(last['timestamp'])
+        return elapsed >= self.heartbeat_interval
+
+    def mark_written(self, row: Dict[str, Any]):
+        """Remember a row as the last full sample for its address."""
+        self.state[row['address']] = {
+            'timestamp': row['timestamp'],
+            **{field: row.get(field) for field in self.tracked_fields},
+        }
+
+    def save(self):
+        """Persist the cached state."""
+        if not self.cache_file:
+            return
+        with open(self.cache_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def _last_written(self, address: str) -> Optional[Dict[str, Any]]:
+        if address not in self.state and self.supabase is not None:
+            result = self.supabase.table('rewards_history')\
+                .select('*')\
+                .eq('address', address)\
+                .order('timestamp', desc=True)\
+                .limit(1)\
+                .execute()
+            if result.data:
+                self.mark_written(result.data[0])
+        return self.state.get(address)
@@ -0,0 +1,185 @@
+"""Measure rewards_dashboard.py render cost on synthetic datasets.
+
+The dashboard is run headlessly with Streamlit's AppTest against an in-memory
+stand-in for the Supabase client, seeded with synthetic rewards/node_status
+rows. For each size it reports script run time, peak Python memory and the
+time and DataFrame sizes of each dashboard section.
+
+Usage:
+    python benchmarks/dashboard_benchmark.py
+    python benchmarks/dashboard_benchmark.py --sizes 1000 1000000 --json results.json
+    python benchmarks/dashboard_benchmark.py --max-seconds 5   # exit 1 if any run is slower
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DASHBOARD = os.path.join(ROOT, 'rewards_dashboard.py')
+sys.path.insert(0, os.path.join(ROOT, 'algorand_rewards_tracker'))
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ADDRESS = "KK4KTUPTKX3YNA5G2HMYO4CD63F6MTKXDJLIOJ5RRT7TRQK6HC25NUGZTY"
+SECTIONS = ('load', 'metrics', 'chart', 'statistics', 'node_status')
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class StubQuery:
+    def __init__(self, rows):
+        """Just enough of the PostgREST query builder for the dashboard."""
+        self.rows = rows
+        self.filters = []
+        self.descending = False
+        self.row_limit = None
+
+    def select(self, *columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc=False):
+        # Seeded rows are already in timestamp order
+        self.descending = desc
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(row.get(c) == v for c, v in self.filters)]
+        if self.descending:
+            rows = rows[::-1]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        return StubResponse(rows)
+
+
+class StubSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return StubQuery(self.tables.get(name, []))
+
+
+def synthetic_tables(num_rewards):
+    """Seed rewards and node_status rows for one address."""
+    start = datetime(2025, 2, 15, tzinfo=timezone.utc)
+    rewards = [
+        {
+            'id': i + 1,
+            'address': ADDRESS,
+            'timestamp': (start + timedelta(minutes=7 * i)).isoformat(),
+            'round': 46_000_000 + 150 * i,
+            'amount': 10.0 + (i % 97) / 100,
+            'tx_id': f"TX{i:050d}",
+        }
+        for i in range(num_rewards)
+    ]
+    node_status = [{
+        'id': 1,
+        'address': ADDRESS,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'current_balance': 145726.37,
+        'is_online': True,
+        'current_round': 46_000_000 + 150 * num_rewards,
+        'participation_key_present': True,
+        'time_remaining': '60 days, 0:00:00',
+    }]
+    return {'rewards': rewards, 'node_status': node_status}
+
+
+def install_supabase_stub(tables):
+    """Make `from supabase import create_client` return the in-memory stand-in."""
+    module = types.ModuleType('supabase')
+    module.create_client = lambda supabase_url, supabase_key: StubSupabase(tables)
+    module.Client = StubSupabase
+    sys.modules['supabase'] = module
+
+
+def run_dashboard(timeout):
+    st.cache_data.clear()
+    app = AppTest.from_file(DASHBOARD, default_timeout=timeout)
+    started = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(f"Dashboard raised: {app.exception[0].value}")
+    return app, elapsed
+
+
+def benchmark(num_rewards, measure_memory, timeout):
+    install_supabase_stub(synthetic_tables(num_rewards))
+    os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+    os.environ.setdefault('SUPABASE_KEY', 'benchmark')
+    os.environ.pop('REWARDS_EVENTS_URL', None)
+
+    app, elapsed = run_dashboard(timeout)
+    result = {
+        'rows': num_rewards,
+        'script_seconds': elapsed,
+        'sections': dict(app.session_state['section_timings']),
+    }
+
+    # Measure memory in a separate run so tracing overhead doesn't skew the times
+    if measure_memory:
+        tracemalloc.start()
+        run_dashboard(timeout)
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def print_result(result):
+    peak = result.get('peak_memory_bytes')
+    peak_text = f", peak memory {peak / 2 ** 20:,.1f} MiB" if peak is not None else ""
+    print(f"\n{result['rows']:,} rewards: script {result['script_seconds']:.3f}s{peak_text}")
+    for name in SECTIONS:
+        section = result['sections'].get(name)
+        if section:
+            print(f"  {name:<12} {section['seconds'] * 1000:>10.1f} ms "
+                  f"{section['rows']:>10,} rows {section['bytes'] / 2 ** 20:>9.2f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory run")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    parser.add_argument('--max-seconds', type=float, help="fail if any script run is slower")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = benchmark(size, not args.no_memory, args.timeout)
+        print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_seconds is not None:
+        slow = [r['rows'] for r in results if r['script_seconds'] > args.max_seconds]
+        if slow:
+            print(f"\nScript run exceeded {args.max_seconds}s for sizes: {slow}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Compare response decode cost before and after the API client changes.
+
+The baseline decodes the full JSON body with the stdlib, as ``response.json()``
+did. The optimized account path is the request the pipeline makes: JSON with
+``exclude=all``, so assets and apps are never transferred, decoded with orjson
+when available and projected down to the fields the trackers use. The
+``account-msgpack`` line is the msgpack path taken when a caller asks for
+fewer fields. Indexer transactions are decoded with orjson and projected.
+
+Usage:
+    python benchmarks/decode_benchmark.py                 # synthetic payloads
+    python benchmarks/decode_benchmark.py --assets 5000   # heavier accounts
+    python benchmarks/decode_benchmark.py --live ADDRESS  # real algod/indexer
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'algorand_rewards_tracker'))
+
+import msgpack
+import requests
+
+from api_client import (ACCOUNT_FIELDS, ALGOD_URL, EXCLUDABLE_ACCOUNT_FIELDS, INDEXER_URL,
+                        JSON_ONLY_ACCOUNT_FIELDS,
+                        PROPOSER_PAYOUT_NOTE_PREFIX, decode_json, project_account,
+                        project_transaction)
+
+# Fields the msgpack account encoding can carry
+MSGPACK_FIELDS = tuple(f for f in ACCOUNT_FIELDS if f not in JSON_ONLY_ACCOUNT_FIELDS)
+
+
+def synthetic_account(num_assets: int, num_apps: int) -> dict:
+    """Build an account response shaped like algod's, with many assets and apps."""
+    return {
+        'address': 'A' * 58,
+        'amount': 145726370000,
+        'amount-without-pending-rewards': 145726370000,
+        'min-balance': 100000 + 100000 * num_assets,
+        'pending-rewards': 0,
+        'rewards': 0,
+        'rewards-base': 218288,
+        'round': 46000000,
+        'status': 'Online',
+        'participation': {
+            'selection-participation-key': 'c2VsZWN0aW9u' * 4,
+            'vote-first-valid': 45000000,
+            'vote-last-valid': 48000000,
+            'vote-key-dilution': 1733,
+            'vote-participation-key': 'dm90ZQ==' * 8,
+        },
+        'assets': [
+            {'amount': i * 1000, 'asset-id': 31566704 + i, 'is-frozen': False}
+            for i in range(num_assets)
+        ],
+        'apps-local-state': [
+            {
+                'id': 1000 + i,
+                'schema': {'num-byte-slice': 2, 'num-uint': 4},
+                'key-value': [
+                    {'key': f'a2V5{j}', 'value': {'bytes': '', 'type': 2, 'uint': j}}
+                    for j in range(4)
+                ],
+            }
+            for i in range(num_apps)
+        ],
+    }
+
+
+def excluded_account(account: dict) -> dict:
+    """The account as algod returns it with exclude=all."""
+    return {k: v for k, v in account.items() if k not in EXCLUDABLE_ACCOUNT_FIELDS}
+
+
+def synthetic_msgpack_account(account: dict) -> dict:
+    """Re-key a synthetic account with algod's msgpack codec names."""
+    encoded = {k: v for k, v in account.items()
+               if k not in ('amount', 'rewards', 'rewards-base', 'status', 'participation')
+               and k not in JSON_ONLY_ACCOUNT_FIELDS}
+    participation = account['participation']
+    encoded.update({
+        'algo': account['amount'],
+        'ern': account['rewards'],
+        'ebase': account['rewards-base'],
+        'onl': 1,
+        'voteFst': participation['vote-first-valid'],
+        'voteLst': participation['vote-last-valid'],
+        'voteKD': participation['vote-key-dilution'],
+        'sel': b'\x01' * 32,
+        'vote': b'\x02' * 32,
+    })
+    return encoded
+
+
+def synthetic_transactions(count: int) -> dict:
+    """Build an indexer transactions page of ProposerPayout payments."""
+    return {
+        'current-round': 46000000,
+        'transactions': [
+            {
+                'id': f'TX{i:050d}',
+                'confirmed-round': 45000000 + i,
+                'round-time': 1739577600 + i * 3600,
+                'fee': 0,
+                'first-valid': 45000000 + i,
+                'last-valid': 45001000 + i,
+                'note': PROPOSER_PAYOUT_NOTE_PREFIX,
+                'sender': 'Y76M3MSY6DKBRHBL7C3NNDXGS5IIMQVQVUAB6MP4XEMMGVF2QWNPL226CA',
+                'payment-transaction': {
+                    'amount': 10000000 + i,
+                    'close-amount': 0,
+                    'receiver': 'A' * 58,
+                },
+                'signature': {'sig': 'c2ln' * 22},
+                'tx-type': 'pay',
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def time_decode(decode, payload: bytes, iterations: int) -> float:
+    """Return the mean decode time in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(payload)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def report(name: str, before_bytes: int, before_ms: float, after_bytes: int, after_ms: float):
+    """Print a before/after comparison line."""
+    print(f"{name:<16} before: {before_bytes:>10,} B {before_ms:>9.3f} ms | "
+          f"after: {after_bytes:>10,} B {after_ms:>9.3f} ms | "
+          f"speedup: {before_ms / max(after_ms, 1e-9):.1f}x")
+
+
+def run_synthetic(args):
+    account = synthetic_account(args.assets, args.apps)
+    account_json = json.dumps(account).encode()
+    excluded_json = json.dumps(excluded_account(account)).encode()
+    account_msgpack = msgpack.packb(synthetic_msgpack_account(excluded_account(account)), use_bin_type=True)
+    before_ms = time_decode(json.loads, account_json, args.iterations)
+    report(
+        'account',
+        len(account_json), before_ms,
+        len(excluded_json),
+        time_decode(lambda b: project_account(decode_json(b)), excluded_json, args.iterations),
+    )
+    report(
+        'account-msgpack',
+        len(account_json), before_ms,
+        len(account_msgpack),
+        time_decode(lambda b: project_account(msgpack.unpackb(b, raw=False), MSGPACK_FIELDS),
+                    account_msgpack, args.iterations),
+    )
+
+    transactions_json = json.dumps(synthetic_transactions(args.transactions)).encode()
+    report(
+        'transactions',
+        len(transactions_json), time_decode(json.loads, transactions_json, args.iterations),
+        len(transactions_json),
+        time_decode(lambda b: [project_transaction(tx) for tx in decode_json(b)['transactions']],
+                    transactions_json, args.iterations),
+    )
+
+
+def run_live(args):
+    session = requests.Session()
+    account_url = f"{ALGOD_URL}/v2/accounts/{args.live}"
+    account_json = session.get(account_url).content
+    excluded_json = session.get(account_url, params={'exclude': 'all'}).content
+    account_msgpack = session.get(account_url, params={'exclude': 'all', 'format': 'msgpack'}).content
+    before_ms = time_decode(json.loads, account_json, args.iterations)
+    report(
+        'account',
+        len(account_json), before_ms,
+        len(excluded_json),
+        time_decode(lambda b: project_account(decode_json(b)), excluded_json, args.iterations),
+    )
+    report(
+        'account-msgpack',
+        len(account_json), before_ms,
+        len(account_msgpack),
+        time_decode(lambda b: project_account(msgpack.unpackb(b, raw=False, strict_map_key=False),
+                                                  MSGPACK_FIELDS),
+                    account_msgpack, args.iterations),
+    )
+
+    transactions_json = session.get(
+        f"{INDEXER_URL}/v2/accounts/{args.live}/transactions",
+        params={'limit': 1000, 'note-prefix': PROPOSER_PAYOUT_NOTE_PREFIX},
+    ).content
+    report(
+        'transactions',
+        len(transactions_json), time_decode(json.loads, transactions_json, args.iterations),
+        len(transactions_json),
+        time_decode(lambda b: [project_transaction(tx) for tx in decode_json(b)['transactions']],
+                    transactions_json, args.iterations),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--assets', type=int, default=1000)
+    parser.add_argument('--apps', type=int, default=50)
+    parser.add_argument('--transactions', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--live', metavar='ADDRESS', help='benchmark against the live AlgoNode APIs')
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args)
+    else:
+        run_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
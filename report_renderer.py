@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+REPORTS_DIR = Path('reports')
+
+# Figure size (inches) and dpi for full reports and fast previews
+FULL_SIZE = ((15, 16), 300)
+PREVIEW_SIZE = ((7.5, 8), 72)
+
+PAGE_SIZE = 1000  # PostgREST returns at most this many rows per request
+
+
+def report_key(address: str, records: List[Dict], preview: bool = False) -> str:
+    """Hash the data and options a report is rendered from."""
+    payload = json.dumps(
+        {'address': address, 'records': records, 'preview': preview},
+        sort_keys=True,
+        default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value)
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def report_path(address: str, records: List[Dict], preview: bool = False,
+                output_dir: Path = REPORTS_DIR) -> Path:
+    """Return the cached image path for a report."""
+    suffix = '-preview' if preview else ''
+    return output_dir / f"{address}-{report_key(address, records, preview)[:16]}{suffix}.png"
+
+
+def render_report(address: str, records: List[Dict], preview: bool = False,
+                  output_dir: Path = REPORTS_DIR) -> Path:
+    """Render a rewards report headlessly, reusing the cached image if the data is unchanged.
+
+    Records hold datetime, amount, cumulative_rewards (both in ALGO) and rewards_base.
+    """
+    path = report_path(address, records, preview, output_dir)
+    if path.exists():
+        return path
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    figsize, dpi = PREVIEW_SIZE if preview else FULL_SIZE
+    fig = Figure(figsize=figsize, facecolor='white')
+    FigureCanvasAgg(fig)
+    gs = fig.add_gridspec(3, 1, height_ratios=[2, 2, 1], hspace=0.4)
+
+    dates = [record['datetime'] for record in records]
+    cumulative_rewards = [record['cumulative_rewards'] for record in records]
+    latest = records[-1]
+
+    # Plot 1: Account Balance and Rewards (Bar Chart)
+    ax1 = fig.add_subplot(gs[0])
+    bars = ax1.bar(['Account Balance', 'Total Rewards'],
+                   [latest['amount'], latest['cumulative_rewards']],
+                   color=['#2ecc71', '#3498db'])
+    ax1.set_title('Current Account Balance and Rewards (ALGO)', pad=20)
+    ax1.grid(True, alpha=0.3)
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{height:,.6f}',
+                 ha='center', va='bottom')
+
+    # Plot 2: Rewards Over Time (Line Chart)
+    ax2 = fig.add_subplot(gs[1])
+    ax2.plot(dates, cumulative_rewards,
+             color='#3498db',
+             marker='o' if not preview else None,
+             linewidth=2,
+             markersize=8)
+    ax2.set_title('Rewards Over Time', pad=20)
+    ax2.set_xlabel('Date', labelpad=10)
+    ax2.set_ylabel('Cumulative Rewards (ALGO)', labelpad=10)
+    ax2.grid(True, alpha=0.3)
+    for label in ax2.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha('right')
+
+    # Plot 3: Rewards Information (Text)
+    ax3 = fig.add_subplot(gs[2])
+    rewards_info = f"""
+        Rewards Information:
+        -------------------
+        Total Rewards: {latest['cumulative_rewards']:,.6f} ALGO
+        Rewards Base: {latest['rewards_base']:,}
+        Last Updated: {latest['datetime'].strftime('%Y-%m-%d %H:%M:%S')}
+        First Tracked: {dates[0].strftime('%Y-%m-%d %H:%M:%S')}
+        Tracking Period: {(dates[-1] - dates[0]).days} days
+
+        Account Information:
+        ------------------
+        Current Balance: {latest['amount']:,.6f} ALGO
+        """
+    ax3.text(0.05, 0.95, rewards_info,
+             transform=ax3.transAxes,
+             fontsize=12 if not preview else 7,
+             verticalalignment='top',
+             family='monospace')
+    ax3.axis('off')
+
+    fig.suptitle(f'Algorand Account Overview\n{address}', fontsize=14, y=0.98)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
+
+
+def _render_report(args) -> Path:
+    return render_report(*args)
+
+
+def render_reports(reports: Dict[str, List[Dict]], preview: bool = False,
+                   output_dir: Path = REPORTS_DIR, workers: Optional[int] = None) -> Dict[str, Path]:
+    """Render reports for many addresses in parallel, skipping unchanged ones."""
+    paths = {}
+    pending = []
+    for address, records in reports.items():
+        if not records:
+            continue
+        path = report_path(address, records, preview, output_dir)
+        if path.exists():
+            paths[address] = path
+        else:
+            pending.append((address, records, preview, output_dir))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for args, path in zip(pending, executor.map(_render_report, pending)):
+                paths[args[0]] = path
+    print(f"Rendered {len(pending)} reports, {len(paths) - len(pending)} unchanged")
+    return paths
+
+
+def history_report_record(row: Dict) -> Dict:
+    """Convert a rewards_history row to a report record."""
+    return {
+        'datetime': datetime.fromisoformat(row['timestamp']),
+        'amount': row['amount'] / 1e6,  # Convert microAlgos to Algos
+        'cumulative_rewards': row['cumulative_rewards'] / 1e6,
+        'rewards_base': row['rewards_base'],
+    }
+
+
+def load_history_records(supabase, address: str) -> List[Dict]:
+    """Load an address's rewards_history as report records, one page at a time."""
+    query = supabase.table('rewards_history')\
+        .select('timestamp,amount,cumulative_rewards,rewards_base')\
+        .eq('address', address)\
+        .order('timestamp')\
+        .order('id')
+    records = []
+    start = 0
+    while True:
+        page = query.range(start, start + PAGE_SIZE - 1).execute().data
+        records.extend(history_report_record(row) for row in page)
+        if len(page) < PAGE_SIZE:
+            return records
+        start += PAGE_SIZE
+
+
+def main():
+    from supabase import create_client
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Render rewards reports for a fleet of addresses")
+    parser.add_argument('addresses_file', help="file with one address per line")
+    parser.add_argument('--output-dir', type=Path, default=REPORTS_DIR)
+    parser.add_argument('--preview', action='store_true', help="render fast low-resolution previews")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Missing Supabase credentials")
+    supabase = create_client(supabase_url=supabase_url, supabase_key=supabase_key)
+
+    with open(args.addresses_file, 'r') as f:
+        addresses = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    reports = {address: load_history_records(supabase, address) for address in addresses}
+    paths = render_reports(reports, args.preview, args.output_dir, args.workers)
+    for address, path in paths.items():
+        print(f"{address}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+-- Retention tiers for rewards_history
+-- Raw samples are kept for a configurable window, then rolled up into
+-- daily summaries, which are in turn rolled up into weekly summaries.
+-- Run after supabase_setup.sql and before rewards_view.sql.
+
+-- Create daily summary tier
+CREATE TABLE IF NOT EXISTS rewards_history_daily (
+    address TEXT NOT NULL,
+    day DATE NOT NULL,
+    min_round BIGINT NOT NULL,
+    max_round BIGINT NOT NULL,
+    min_balance NUMERIC NOT NULL,
+    max_balance NUMERIC NOT NULL,
+    avg_balance NUMERIC NOT NULL,
+    min_rewards NUMERIC NOT NULL,
+    max_rewards NUMERIC NOT NULL,
+    max_cumulative_rewards NUMERIC NOT NULL,
+    online_ratio NUMERIC NOT NULL,
+    participation_ratio NUMERIC NOT NULL,
+    num_checks BIGINT NOT NULL,
+    sampled_seconds NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (address, day)
+);
+
+-- Create weekly summary tier
+CREATE TABLE IF NOT EXISTS rewards_history_weekly (
+    address TEXT NOT NULL,
+    week DATE NOT NULL,
+    min_round BIGINT NOT NULL,
+    max_round BIGINT NOT NULL,
+    min_balance NUMERIC NOT NULL,
+    max_balance NUMERIC NOT NULL,
+    avg_balance NUMERIC NOT NULL,
+    min_rewards NUMERIC NOT NULL,
+    max_rewards NUMERIC NOT NULL,
+    max_cumulative_rewards NUMERIC NOT NULL,
+    online_ratio NUMERIC NOT NULL,
+    participation_ratio NUMERIC NOT NULL,
+    num_checks BIGINT NOT NULL,
+    sampled_seconds NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (address, week)
+);
+
+-- Summaries compacted before change-only writes were averages of hourly samples
+ALTER TABLE rewards_history_daily ADD COLUMN IF NOT EXISTS sampled_seconds NUMERIC NOT NULL DEFAULT 0;
+ALTER TABLE rewards_history_weekly ADD COLUMN IF NOT EXISTS sampled_seconds NUMERIC NOT NULL DEFAULT 0;
+UPDATE rewards_history_daily SET sampled_seconds = num_checks * 3600 WHERE sampled_seconds = 0;
+UPDATE rewards_history_weekly SET sampled_seconds = num_checks * 3600 WHERE sampled_seconds = 0;
+
+-- Raw samples are only written when something changed, so each one describes
+-- the state until the next sample of the address (or now, for the latest).
+-- held_seconds is that interval, cut at the end of the sample's day, and is
+-- the weight of the sample in averages. num_checks counts stored samples.
+CREATE OR REPLACE VIEW rewards_history_intervals AS
+SELECT
+    h.*,
+    greatest(
+        extract(epoch FROM least(
+            coalesce(lead(timestamp) OVER (PARTITION BY address ORDER BY timestamp), now()),
+            date_trunc('day', timestamp) + interval '1 day'
+        ) - timestamp),
+        1
+    ) AS held_seconds
+FROM rewards_history h;
+
+ALTER TABLE rewards_history_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rewards_history_weekly ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow all operations on rewards_history_daily" ON rewards_history_daily;
+CREATE POLICY "Allow all operations on rewards_history_daily"
+ON rewards_history_daily FOR ALL
+USING (true)
+WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow all operations on rewards_history_weekly" ON rewards_history_weekly;
+CREATE POLICY "Allow all operations on rewards_history_weekly"
+ON rewards_history_weekly FOR ALL
+USING (true)
+WITH CHECK (true);
+
+-- Roll raw samples older than raw_retention into daily rows, and daily rows
+-- older than daily_retention into weekly rows, deleting what was rolled up.
+-- Re-running is safe: summaries for an existing period are merged, not replaced.
+CREATE OR REPLACE FUNCTION compact_rewards_history(
+    raw_retention INTERVAL DEFAULT '30 days',
+    daily_retention INTERVAL DEFAULT '365 days'
+)
+RETURNS TABLE (raw_rows_compacted BIGINT, daily_rows_compacted BIGINT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    raw_cutoff TIMESTAMPTZ := date_trunc('day', now() - raw_retention);
+    daily_cutoff DATE := date_trunc('week', now() - daily_retention)::date;
+BEGIN
+    INSERT INTO rewards_history_daily AS d
+    SELECT
+        address,
+        date_trunc('day', timestamp)::date,
+        min(current_round),
+        max(current_round),
+        min(amount),
+        max(amount),
+        sum(amount * held_seconds) / sum(held_seconds),
+        min(rewards),
+        max(rewards),
+        max(cumulative_rewards),
+        sum(is_online::int * held_seconds) / sum(held_seconds),
+        sum(participation_active::int * held_seconds) / sum(held_seconds),
+        count(*),
+        sum(held_seconds)
+    FROM rewards_history_intervals
+    WHERE timestamp < raw_cutoff
+    GROUP BY address, date_trunc('day', timestamp)
+    ON CONFLICT (address, day) DO UPDATE SET
+        min_round = least(d.min_round, excluded.min_round),
+        max_round = greatest(d.max_round, excluded.max_round),
+        min_balance = least(d.min_balance, excluded.min_balance),
+        max_balance = greatest(d.max_balance, excluded.max_balance),
+        avg_balance = (d.avg_balance * d.sampled_seconds + excluded.avg_balance * excluded.sampled_seconds)
+            / (d.sampled_seconds + excluded.sampled_seconds),
+        min_rewards = least(d.min_rewards, excluded.min_rewards),
+        max_rewards = greatest(d.max_rewards, excluded.max_rewards),
+        max_cumulative_rewards = greatest(d.max_cumulative_rewards, excluded.max_cumulative_rewards),
+        online_ratio = (d.online_ratio * d.sampled_seconds + excluded.online_ratio * excluded.sampled_seconds)
+            / (d.sampled_seconds + excluded.sampled_seconds),
+        participation_ratio = (d.participation_ratio * d.sampled_seconds + excluded.participation_ratio * excluded.sampled_seconds)
+            / (d.sampled_seconds + excluded.sampled_seconds),
+        num_checks = d.num_checks + excluded.num_checks,
+        sampled_seconds = d.sampled_seconds + excluded.sampled_seconds;
+
+    DELETE FROM rewards_history WHERE timestamp < raw_cutoff;
+    GET DIAGNOSTICS raw_rows_compacted = ROW_COUNT;
+
+    INSERT INTO rewards_history_weekly AS w
+    SELECT
+        address,
+        date_trunc('week', day)::date,
+        min(min_round),
+        max(max_round),
+        min(min_balance),
+        max(max_balance),
+        sum(avg_balance * sampled_seconds) / sum(sampled_seconds),
+        min(min_rewards),
+        max(max_rewards),
+        max(max_cumulative_rewards),
+        sum(online_ratio * sampled_seconds) / sum(sampled_seconds),
+        sum(participation_ratio * sampled_seconds) / sum(sampled_seconds),
+        sum(num_checks),
+        sum(sampled_seconds)
+    FROM rewards_history_daily
+    WHERE day < daily_cutoff
+    GROUP BY address, date_trunc('week', day)
+    ON CONFLICT (address, week) DO UPDATE SET
+        min_round = least(w.min_round, excluded.min_round),
+        max_round = greatest(w.max_round, excluded.max_round),
+        min_balance = least(w.min_balance, excluded.min_balance),
+        max_balance = greatest(w.max_balance, excluded.max_balance),
+        avg_balance = (w.avg_balance * w.sampled_seconds + excluded.avg_balance * excluded.sampled_seconds)
+            / (w.sampled_seconds + excluded.sampled_seconds),
+        min_rewards = least(w.min_rewards, excluded.min_rewards),
+        max_rewards = greatest(w.max_rewards, excluded.max_rewards),
+        max_cumulative_rewards = greatest(w.max_cumulative_rewards, excluded.max_cumulative_rewards),
+        online_ratio = (w.online_ratio * w.sampled_seconds + excluded.online_ratio * excluded.sampled_seconds)
+            / (w.sampled_seconds + excluded.sampled_seconds),
+        participation_ratio = (w.participation_ratio * w.sampled_seconds + excluded.participation_ratio * excluded.sampled_seconds)
+            / (w.sampled_seconds + excluded.sampled_seconds),
+        num_checks = w.num_checks + excluded.num_checks,
+        sampled_seconds = w.sampled_seconds + excluded.sampled_seconds;
+
+    DELETE FROM rewards_history_daily WHERE day < daily_cutoff;
+    GET DIAGNOSTICS daily_rows_compacted = ROW_COUNT;
+
+    RETURN NEXT;
+END;
+$$;
@@ -4,11 +4,21 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
 from algo_rewards import AlgorandRewardsTracker
+from event_bus import EVENTS_URL_ENV, SSESubscriber
+from downsample import chart_points, lttb_indices
 import requests
 import os
+import time
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+# Page config
+st.set_page_config(
+    page_title="Algorand Node Rewards Dashboard",
+    page_icon="💰",
+    layout="wide"
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -30,20 +40,15 @@ except Exception as e:
     st.error(f"Failed to initialize Supabase client: {e}")
     st.stop()
 
-# Page config
-st.set_page_config(
-    page_title="Algorand Node Rewards Dashboard",
-    page_icon="💰",
-    layout="wide"
-)
-
 # Constants
 address = "KK4KTUPTKX3YNA5G2HMYO4CD63F6MTKXDJLIOJ5RRT7TRQK6HC25NUGZTY"
 start_date = datetime(2025, 2, 15)
 original_balance = 145726.37  # Updated original balance
+events_url = os.getenv(EVENTS_URL_ENV)
+LIVE_REFRESH_SECONDS = 5
 
 def get_data_from_supabase():
-    """Fetch data from Supabase."""
+    """Fetch the full rewards frame and latest node status from Supabase."""
     try:
         # Get latest node status
         node_status = supabase.table('node_status')\
@@ -61,31 +66,103 @@ def get_data_from_supabase():
             .execute()
         
         # Convert to DataFrame
-        if rewards.data:
-            df = pd.DataFrame(rewards.data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = pd.DataFrame(rewards.data)
+        if not df.empty:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
             df['cumulative_rewards'] = df['amount'].cumsum()
             
-            # Calculate metrics
-            total_rewards = df['amount'].sum()
-            current_balance = original_balance + total_rewards  # Calculate current balance
-            roi = (total_rewards / original_balance) * 100  # Calculate ROI based on original balance
-            
-            return df, current_balance, roi, original_balance, total_rewards, node_status.data[0] if node_status.data else None
-            
-        return pd.DataFrame(), original_balance, 0, original_balance, 0, None
+        return df, node_status.data[0] if node_status.data else None
         
     except Exception as e:
         st.error(f"Error fetching data from Supabase: {e}")
-        return pd.DataFrame(), original_balance, 0, original_balance, 0, None
+        return pd.DataFrame(), None
+
+def apply_events(df, node_status, events):
+    """Append pushed rewards to the cached frame and take the latest node status."""
+    statuses = [e['payload'] for e in events if e['kind'] == 'status' and e['payload'].get('address') == address]
+    if statuses:
+        node_status = statuses[-1]
+    
+    new_rewards = [e['payload'] for e in events if e['kind'] == 'reward' and e['payload'].get('address') == address]
+    if not new_rewards:
+        return df, node_status
+    
+    new_df = pd.DataFrame(new_rewards).drop_duplicates('tx_id')
+    if not df.empty:
+        new_df = new_df[~new_df['tx_id'].isin(df['tx_id'])]
+    if new_df.empty:
+        return df, node_status
+    
+    new_df['timestamp'] = pd.to_datetime(new_df['timestamp'], utc=True)
+    new_df = new_df.sort_values('timestamp')
+    previous_total = df['cumulative_rewards'].iloc[-1] if not df.empty else 0
+    new_df['cumulative_rewards'] = previous_total + new_df['amount'].cumsum()
+    return pd.concat([df, new_df], ignore_index=True), node_status
+
+@st.cache_data(max_entries=32)
+def downsample_rewards(_df, data_version, zoom, n_points):
+    """Downsample the cumulative rewards in the zoom window, cached per data version and zoom level."""
+    start, end = (pd.Timestamp(bound, tz='UTC') for bound in zoom)
+    window = _df[(_df['timestamp'] >= start) & (_df['timestamp'] <= end)]
+    seconds = (window['timestamp'] - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+    indices = lttb_indices(seconds, window['cumulative_rewards'].to_numpy(), n_points)
+    return window.iloc[indices]
+
+def record_section(name, started, *frames):
+    """Record a section's run time and DataFrame sizes for the render benchmark."""
+    frames = [frame for frame in frames if frame is not None]
+    st.session_state.setdefault('section_timings', {})[name] = {
+        'seconds': time.perf_counter() - started,
+        'rows': sum(len(frame) for frame in frames),
+        'bytes': sum(int(frame.memory_usage(index=True).sum()) for frame in frames)
+    }
+
+def calculate_metrics(df):
+    """Calculate current balance, ROI and total rewards from the rewards frame."""
+    total_rewards = df['amount'].sum() if not df.empty else 0
+    current_balance = original_balance + total_rewards  # Calculate current balance
+    roi = (total_rewards / original_balance) * 100  # Calculate ROI based on original balance
+    return current_balance, roi, total_rewards
 
-# Get data
-df, current_balance, roi, original_balance, total_rewards, node_status = get_data_from_supabase()
+@st.cache_resource
+def get_event_subscriber(url):
+    """One event stream connection shared by every dashboard session."""
+    return SSESubscriber(url)
+
+subscriber = get_event_subscriber(events_url) if events_url else None
+
+# Get data, querying Supabase only on first load and explicit refresh. The event
+# cursor is taken first so nothing published during the load is missed; events
+# already in the loaded rows are dropped by tx_id in apply_events.
+if 'rewards_df' not in st.session_state:
+    if subscriber is not None:
+        st.session_state.event_cursor = subscriber.cursor()
+    section_start = time.perf_counter()
+    st.session_state.rewards_df, st.session_state.node_status = get_data_from_supabase()
+    record_section('load', section_start, st.session_state.rewards_df)
+
+# Live updates: append only the pushed delta to the cached frame
+live_updates = False
+if subscriber is not None:
+    live_updates = st.sidebar.toggle("Live updates", value=True)
+    st.session_state.event_cursor, events = subscriber.events_since(
+        st.session_state.get('event_cursor', subscriber.cursor())
+    )
+    st.session_state.rewards_df, st.session_state.node_status = apply_events(
+        st.session_state.rewards_df,
+        st.session_state.node_status,
+        events
+    )
+
+df = st.session_state.rewards_df
+node_status = st.session_state.node_status
+current_balance, roi, total_rewards = calculate_metrics(df)
 
 # Dashboard title
 st.title("🏦 Algorand Node Rewards Dashboard")
 
 # Top metrics
+section_start = time.perf_counter()
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
@@ -117,15 +194,27 @@ with col4:
         f"{roi:.2f}%",
         f"Based on {original_balance:.2f} ALGO initial"
     )
+record_section('metrics', section_start, df)
 
 # Cumulative rewards over time
+section_start = time.perf_counter()
+chart_df = None
 st.subheader("📈 Cumulative Rewards Over Time")
 if not df.empty:
+    # Only send about one point per pixel of chart width to the browser
+    chart_width = st.sidebar.number_input("Chart width (px)", min_value=400, max_value=4000, value=1200, step=100)
+    first = df['timestamp'].iloc[0].tz_convert(None).to_pydatetime()
+    last = df['timestamp'].iloc[-1].tz_convert(None).to_pydatetime()
+    zoom = (first, last)
+    if first < last:
+        zoom = st.slider("Zoom", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD")
+    chart_df = downsample_rewards(df, (len(df), df['tx_id'].iloc[-1]), zoom, chart_points(chart_width))
+    
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['cumulative_rewards'],
-        mode='lines+markers',
+        x=chart_df['timestamp'],
+        y=chart_df['cumulative_rewards'],
+        mode='lines+markers' if len(chart_df) <= 500 else 'lines',
         name='Cumulative Rewards',
         line=dict(width=2, color='#2ecc71'),
         hovertemplate="Date: %{x}<br>Total Rewards: %{y:.2f} ALGO<extra></extra>"
@@ -138,8 +227,11 @@ if not df.empty:
         showlegend=False
     )
     st.plotly_chart(fig, use_container_width=True)
+record_section('chart', section_start, chart_df)
 
 # Rewards statistics
+section_start = time.perf_counter()
+recent_rewards = metrics_df = None
 st.subheader("📊 Rewards Statistics")
 col1, col2 = st.columns(2)
 
@@ -179,8 +271,11 @@ with col2:
             {'Metric': 'Avg Time Between Rewards', 'Value': f"{avg_time_between.total_seconds() / 3600:.1f} hours"},
         ])
         st.dataframe(metrics_df, hide_index=True)
+record_section('statistics', section_start, recent_rewards, metrics_df)
 
 # Node status details
+section_start = time.perf_counter()
+status_df = None
 st.subheader("🖥️ Node Status")
 if node_status:
     status_df = pd.DataFrame([
@@ -191,7 +286,13 @@ if node_status:
         {'Metric': 'Last Updated', 'Value': datetime.fromisoformat(node_status['timestamp']).strftime('%Y-%m-%d %H:%M:%S')},
     ])
     st.dataframe(status_df, hide_index=True)
+record_section('node_status', section_start, status_df)
 
 # Add refresh button
 if st.button("🔄 Refresh Data"):
-    st.experimental_rerun() 
\ No newline at end of file
+    del st.session_state['rewards_df']
+    st.experimental_rerun()
+
+if live_updates:
+    time.sleep(LIVE_REFRESH_SECONDS)
+    st.experimental_rerun()
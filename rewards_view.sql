@@ -1,28 +1,105 @@
 -- Create a view for rewards over time
+-- Reads raw hourly samples and the compacted daily/weekly tiers from retention.sql
 create or replace view rewards_over_time as
-select 
-    date_trunc('hour', timestamp) as time_period,
+select
+    time_period,
     address,
-    rewards / 1e6 as rewards_algo,
-    cumulative_rewards / 1e6 as cumulative_rewards_algo,
-    amount / 1e6 as balance_algo,
+    rewards_algo,
+    cumulative_rewards_algo,
+    balance_algo,
     is_online,
     participation_active,
-    current_round
-from rewards_history
-order by timestamp desc;
+    current_round,
+    granularity
+from (
+    select
+        date_trunc('hour', timestamp) as time_period,
+        address,
+        rewards / 1e6 as rewards_algo,
+        cumulative_rewards / 1e6 as cumulative_rewards_algo,
+        amount / 1e6 as balance_algo,
+        is_online,
+        participation_active,
+        current_round,
+        'hour' as granularity
+    from rewards_history
+    union all
+    select
+        day::timestamptz,
+        address,
+        max_rewards / 1e6,
+        max_cumulative_rewards / 1e6,
+        avg_balance / 1e6,
+        online_ratio = 1,
+        participation_ratio = 1,
+        max_round,
+        'day'
+    from rewards_history_daily
+    union all
+    select
+        week::timestamptz,
+        address,
+        max_rewards / 1e6,
+        max_cumulative_rewards / 1e6,
+        avg_balance / 1e6,
+        online_ratio = 1,
+        participation_ratio = 1,
+        max_round,
+        'week'
+    from rewards_history_weekly
+) tiers
+order by time_period desc;
 
 -- Create a view for daily rewards summary
+-- Weekly tier rows cover the whole week starting at "day". average_balance is
+-- time-weighted; num_checks counts stored samples, which are change-only.
 create or replace view daily_rewards_summary as
-select 
-    date_trunc('day', timestamp) as day,
+select
+    day,
     address,
-    max(rewards / 1e6) - min(rewards / 1e6) as rewards_earned_today,
-    max(cumulative_rewards / 1e6) as total_rewards,
-    avg(amount / 1e6) as average_balance,
-    bool_and(is_online) as consistently_online,
-    bool_and(participation_active) as consistently_participating,
-    count(*) as num_checks
-from rewards_history
-group by date_trunc('day', timestamp), address
-order by day desc; 
\ No newline at end of file
+    rewards_earned_today,
+    total_rewards,
+    average_balance,
+    consistently_online,
+    consistently_participating,
+    num_checks,
+    granularity
+from (
+    select
+        date_trunc('day', timestamp) as day,
+        address,
+        max(rewards / 1e6) - min(rewards / 1e6) as rewards_earned_today,
+        max(cumulative_rewards / 1e6) as total_rewards,
+        sum(amount * held_seconds) / sum(held_seconds) / 1e6 as average_balance,
+        bool_and(is_online) as consistently_online,
+        bool_and(participation_active) as consistently_participating,
+        count(*) as num_checks,
+        'day' as granularity
+    from rewards_history_intervals
+    group by date_trunc('day', timestamp), address
+    union all
+    select
+        day::timestamptz,
+        address,
+        (max_rewards - min_rewards) / 1e6,
+        max_cumulative_rewards / 1e6,
+        avg_balance / 1e6,
+        online_ratio = 1,
+        participation_ratio = 1,
+        num_checks,
+        'day'
+    from rewards_history_daily
+    union all
+    select
+        week::timestamptz,
+        address,
+        (max_rewards - min_rewards) / 1e6,
+        max_cumulative_rewards / 1e6,
+        avg_balance / 1e6,
+        online_ratio = 1,
+        participation_ratio = 1,
+        num_checks,
+        'week'
+    from rewards_history_weekly
+) tiers
+order by day desc;
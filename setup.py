@@ -16,6 +16,13 @@ setup(
         'schedule==1.2.1',
         'python-dateutil>=2.8.2',
         'postgrest==0.10.6',
-        'gotrue>=1.1.0,<2.0.0'
+        'gotrue>=1.1.0,<2.0.0',
+        'matplotlib>=3.7.0'
     ],
+    extras_require={
+        'fast': [
+            'msgpack>=1.0.0',
+            'orjson>=3.9.0',
+        ],
+    },
 ) 
\ No newline at end of file
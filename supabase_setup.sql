@@ -2,6 +2,7 @@
 DROP TABLE IF EXISTS rewards_history CASCADE;
 DROP TABLE IF EXISTS rewards CASCADE;
 DROP TABLE IF EXISTS node_status CASCADE;
+DROP TABLE IF EXISTS rewards_heartbeat CASCADE;
 DROP VIEW IF EXISTS daily_rewards;
 
 -- Create rewards history table
@@ -44,6 +45,13 @@ CREATE TABLE node_status (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Create heartbeat table, one row per address recording the latest unchanged sample
+CREATE TABLE rewards_heartbeat (
+    address TEXT PRIMARY KEY,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    current_round BIGINT NOT NULL
+);
+
 -- Create indexes
 CREATE INDEX idx_rewards_history_address_timestamp ON rewards_history(address, timestamp);
 CREATE INDEX idx_rewards_address ON rewards(address);
@@ -68,6 +76,7 @@ ORDER BY date DESC;
 ALTER TABLE rewards_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rewards ENABLE ROW LEVEL SECURITY;
 ALTER TABLE node_status ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rewards_heartbeat ENABLE ROW LEVEL SECURITY;
 
 -- Drop existing policies
 DO $$ 
@@ -105,4 +114,10 @@ WITH CHECK (true);
 CREATE POLICY "Allow all operations on node_status"
 ON node_status FOR ALL
 USING (true)
-WITH CHECK (true); 
\ No newline at end of file
+WITH CHECK (true);
+
+CREATE POLICY "Allow all operations on rewards_heartbeat"
+ON rewards_heartbeat FOR ALL
+USING (true)
+WITH CHECK (true);
+ 
\ No newline at end of file
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules import each other by file name, as when run as scripts
+sys.path[:0] = [str(ROOT / 'algorand_rewards_tracker'), str(ROOT)]
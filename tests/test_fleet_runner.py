@@ -0,0 +1,44 @@
+import queue
+from collections import Counter
+
+from fleet_runner import HashRing, _next_address
+
+ADDRESSES = [f"ADDRESS{i:04d}" for i in range(2000)]
+
+
+def test_hash_ring_is_deterministic_and_in_range():
+    ring = HashRing(8)
+    assignments = [ring.worker_for(address) for address in ADDRESSES]
+    assert assignments == [HashRing(8).worker_for(address) for address in ADDRESSES]
+    assert set(assignments) == set(range(8))
+
+
+def test_hash_ring_spreads_addresses_evenly():
+    ring = HashRing(8)
+    counts = Counter(ring.worker_for(address) for address in ADDRESSES)
+    assert max(counts.values()) < 2 * len(ADDRESSES) / 8
+
+
+def test_hash_ring_moves_few_addresses_when_a_worker_is_added():
+    before, after = HashRing(8), HashRing(9)
+    moved = sum(before.worker_for(a) != after.worker_for(a) for a in ADDRESSES)
+    # Only the new worker's share should move, about 1/9 of the addresses
+    assert moved < len(ADDRESSES) / 4
+    assert all(after.worker_for(a) == 8 for a in ADDRESSES if before.worker_for(a) != after.worker_for(a))
+
+
+def test_next_address_prefers_own_queue_then_steals():
+    queues = [queue.Queue() for _ in range(3)]
+    queues[0].put(('OWN', None))
+    queues[2].put(('PEER', None))
+    assert _next_address(0, queues) == ('OWN', None)
+    assert _next_address(0, queues) == ('PEER', None)
+
+
+def test_next_address_wakes_on_token_and_steals():
+    # The parent only sends wake tokens to workers that own nothing this cycle
+    queues = [queue.Queue() for _ in range(3)]
+    queues[0].put(None)
+    queues[1].put(None)
+    queues[2].put(('PEER', None))
+    assert _next_address(0, queues) == ('PEER', None)